@@ -6,9 +6,41 @@ Reads logs, shows system status, and allows control of the trading system.
 import os
 import time
 import datetime
-import csv
+import mmap
+import re
 from collections import Counter
 
+# Second CSV field of every line that follows a newline (i.e. skipping the header)
+_ACTION_COLUMN = re.compile(rb'\n[^,\r\n]*,([^,\r\n]+)')
+
+def _tail(path, num_lines, block_size=65536):
+    """Return the last num_lines lines of a file, reading backwards in blocks."""
+    if num_lines <= 0:
+        return []
+    
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        
+        # Prefetch the last block, which is the one we are about to read
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), max(0, position - block_size), block_size,
+                             os.POSIX_FADV_WILLNEED)
+        blocks = []
+        newlines = 0
+        
+        # Read 64 KiB blocks from the end until we have enough complete lines
+        while position > 0 and newlines <= num_lines:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+    
+    data = b''.join(reversed(blocks)).decode('utf-8', errors='replace')
+    return data.splitlines()[-num_lines:]
+
 class TradingAssistant:
     """Terminal-based assistant for monitoring and controlling TradeMasterX."""
     
@@ -18,15 +50,23 @@ class TradingAssistant:
         self.trades_log = os.path.join(self.logs_dir, 'trades.log')
         self.trades_csv = os.path.join(self.logs_dir, 'trade_history.csv')
         self.control_file = os.path.join('commands', 'control.txt')
+        self._status_cache = (0.0, None)  # (mtime, status) of the control file
     
     def get_system_status(self):
         """Read the control file and return system status."""
-        if not os.path.exists(self.control_file):
+        try:
+            mtime = os.stat(self.control_file).st_mtime
+        except FileNotFoundError:
             return "UNKNOWN"
         
+        # Only re-read the file when it has been modified since the last read
+        if mtime == self._status_cache[0]:
+            return self._status_cache[1]
+        
         with open(self.control_file, 'r') as f:
             status = f.read().strip().upper()
         
+        self._status_cache = (mtime, status)
         return status
     
     def set_system_status(self, status):
@@ -37,6 +77,9 @@ class TradingAssistant:
         with open(self.control_file, 'w') as f:
             f.write(f"{status}\n")
         
+        # Writes within the filesystem's mtime granularity would not invalidate the cache
+        self._status_cache = (os.stat(self.control_file).st_mtime, status)
+        
         return f"System status set to: {status}"
     
     def get_recent_logs(self, num_lines=10):
@@ -45,10 +88,7 @@ class TradingAssistant:
             return ["No logs found."]
         
         try:
-            with open(self.system_log, 'r') as f:
-                lines = f.readlines()
-            
-            return lines[-num_lines:]
+            return _tail(self.system_log, num_lines)
         except Exception as e:
             return [f"Error reading logs: {str(e)}"]
     
@@ -58,10 +98,7 @@ class TradingAssistant:
             return ["No trades found."]
         
         try:
-            with open(self.trades_log, 'r') as f:
-                lines = f.readlines()
-            
-            return lines[-num_trades:]
+            return _tail(self.trades_log, num_trades)
         except Exception as e:
             return [f"Error reading trades: {str(e)}"]
     
@@ -71,19 +108,20 @@ class TradingAssistant:
             return "No trade history found."
         
         try:
-            trades = []
-            with open(self.trades_csv, 'r') as f:
-                reader = csv.reader(f)
-                next(reader)  # Skip header
-                for row in reader:
-                    trades.append(row[1])  # Action column
-            
-            counter = Counter(trades)
+            counter = Counter()
+            if os.path.getsize(self.trades_csv) > 0:
+                # Scan the mapped file for the action column (2nd field of
+                # every line after the header) without building row objects
+                with open(self.trades_csv, 'rb') as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        counter.update(_ACTION_COLUMN.findall(mm))
             
             summary = "Trade Summary:\n"
-            summary += f"Total Trades: {len(trades)}\n"
+            summary += f"Total Trades: {sum(counter.values())}\n"
             for action, count in counter.items():
-                summary += f"  {action}: {count}\n"
+                summary += f"  {action.decode()}: {count}\n"
             
             return summary
         except Exception as e:
@@ -137,8 +175,7 @@ class TradingAssistant:
             
             else:
                 print("Invalid choice. Please enter a number between 1 and 6.")
-            
-            time.sleep(1)
+                time.sleep(0.5)  # Throttle only invalid-input spam; input() already blocks
 
 if __name__ == "__main__":
     # Run the assistant if this file is executed directly
@@ -3,40 +3,55 @@
 api_client.py
 A simple client for interacting with the TradeMasterX web API.
 """
+import os
 import sys
 import json
 import time
 import argparse
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
+# Faster C JSON parser for API responses if available
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
 class TradeMasterXClient:
     def __init__(self, base_url="http://localhost:5000"):
         """Initialize API client with base URL."""
         self.base_url = base_url
+        
+        # Reuse keep-alive connections instead of opening one per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def _get(self, endpoint):
         """Make a GET request to the API."""
         try:
-            response = requests.get(f"{self.base_url}{endpoint}", timeout=10)
+            response = self.session.get(f"{self.base_url}{endpoint}", timeout=10)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return _json.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"API Error: {e}")
             return None
     
     def _post(self, endpoint, data):
         """Make a POST request to the API."""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}{endpoint}", 
                 json=data,
                 headers={"Content-Type": "application/json"},
                 timeout=10
             )
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return _json.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"API Error: {e}")
             return None
     
@@ -75,15 +90,13 @@ def display_trade_history(trades):
     print(f"{'TIME':<20} {'TYPE':<6} {'CRYPTO':<10} {'PRICE':>10} {'AMOUNT':>10} {'VALUE':>12}")
     print("-" * 72)
     
-    for trade in trades[:10]:  # Show most recent 10 trades
-        timestamp = trade.get('timestamp', 'N/A')
-        action = trade.get('action', 'N/A')
-        crypto = trade.get('crypto', 'N/A')
-        price = float(trade.get('price', 0))
-        amount = float(trade.get('amount', 0))
-        value = float(trade.get('value', 0))
-        
-        print(f"{timestamp:<20} {action:<6} {crypto:<10} ${price:>9.2f} {amount:>10.4f} ${value:>10.2f}")
+    # Show most recent 10 trades, formatted into one block and printed with a single call
+    rows = [
+        f"{trade.get('timestamp', 'N/A'):<20} {trade.get('action', 'N/A'):<6} {trade.get('crypto', 'N/A'):<10} "
+        f"${float(trade.get('price', 0)):>9.2f} {float(trade.get('amount', 0)):>10.4f} ${float(trade.get('value', 0)):>10.2f}"
+        for trade in trades[:10]
+    ]
+    print('\n'.join(rows))
 
 def display_portfolio(portfolio):
     """Display portfolio information."""
@@ -122,37 +135,39 @@ def display_system_status(status):
 
 def monitor_loop(client, interval=5):
     """Monitor system continuously."""
+    # Fetch all endpoints concurrently so each refresh costs ~1 round trip
+    pool = ThreadPoolExecutor(max_workers=4)
+    if os.name == 'nt':
+        os.system('')  # Enable ANSI escape processing used by clear_screen
     try:
         print("Starting continuous monitoring (Press Ctrl+C to stop)...")
         while True:
+            futures = {
+                name: pool.submit(getattr(client, f'get_{name}'))
+                for name in ('system_status', 'portfolio', 'trade_history', 'signals')
+            }
+            
             clear_screen()
             print(f"=== TRADEMASTERX MONITOR === (Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
             
-            # Get and display system status
-            status = client.get_system_status()
-            display_system_status(status)
-            
-            # Get and display portfolio
-            portfolio = client.get_portfolio()
-            display_portfolio(portfolio)
-            
-            # Get and display trade history
-            trades = client.get_trade_history()
-            display_trade_history(trades)
-            
-            # Get and display signals
-            signals = client.get_signals()
-            display_signals(signals)
+            # Display results in the usual order as they become available
+            display_system_status(futures['system_status'].result())
+            display_portfolio(futures['portfolio'].result())
+            display_trade_history(futures['trade_history'].result())
+            display_signals(futures['signals'].result())
             
             print("\nPress Ctrl+C to stop monitoring...")
             time.sleep(interval)
     except KeyboardInterrupt:
         print("\nMonitoring stopped.")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 def clear_screen():
     """Clear terminal screen."""
-    import os
-    os.system('cls' if os.name == 'nt' else 'clear')
+    # ANSI clear + cursor home: a single write instead of spawning a shell
+    sys.stdout.write('\x1b[2J\x1b[H')
+    sys.stdout.flush()
 
 def main():
     """Main function for command line interface."""
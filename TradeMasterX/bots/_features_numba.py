@@ -0,0 +1,128 @@
+"""
+bots/_features_numba.py
+Numba-compiled version of PredictionBot.create_features for the per-tick prediction path,
+and the RSI kernel train_prediction_model.create_features uses.
+Importing this module raises ImportError when Numba is not installed.
+"""
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def _pct_change(price, periods):
+    """Equivalent of Series.pct_change(periods)."""
+    out = np.full(price.shape[0], np.nan)
+    for i in range(periods, price.shape[0]):
+        out[i] = price[i] / price[i - periods] - 1
+    return out
+
+@njit(cache=True)
+def _rolling_mean(values, window, start):
+    """Equivalent of Series.rolling(window).mean() for a series whose first valid value is at `start`."""
+    out = np.full(values.shape[0], np.nan)
+    for i in range(start + window - 1, values.shape[0]):
+        # Windows are at most 20 wide, so summing directly avoids running-sum drift
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += values[j]
+        out[i] = total / window
+    return out
+
+@njit(cache=True)
+def _rolling_std(values, window, mean):
+    """Equivalent of Series.rolling(window).std() (sample standard deviation)."""
+    out = np.full(values.shape[0], np.nan)
+    for i in range(window - 1, values.shape[0]):
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            diff = values[j] - mean[i]
+            total += diff * diff
+        out[i] = np.sqrt(total / (window - 1))
+    return out
+
+@njit(cache=True)
+def _ewm(values, span):
+    """Equivalent of Series.ewm(span=span).mean() (adjust=True, no missing values)."""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    out = np.empty(values.shape[0])
+    numerator = 0.0
+    denominator = 0.0
+    for i in range(values.shape[0]):
+        numerator = values[i] + decay * numerator
+        denominator = 1.0 + decay * denominator
+        out[i] = numerator / denominator
+    return out
+
+@njit(cache=True)
+def rsi(price, period=14):
+    """Simple RSI over the `period`-bar mean gain/loss (same as the pandas version in create_features)."""
+    n = price.shape[0]
+    
+    # Gain and loss of each bar in one pass (the first diff is undefined)
+    gain = np.zeros(n)
+    loss = np.zeros(n)
+    for i in range(1, n):
+        delta = price[i] - price[i - 1]
+        if delta > 0:
+            gain[i] = delta
+        else:
+            loss[i] = -delta
+    
+    avg_gain = _rolling_mean(gain, period, 1)
+    avg_loss = _rolling_mean(loss, period, 1)
+    out = np.empty(n)
+    for i in range(n):
+        # Avoid division by zero
+        loss_i = avg_loss[i] if avg_loss[i] != 0 else 0.001
+        out[i] = 100 - (100 / (1 + avg_gain[i] / loss_i))
+    return out
+
+@njit(cache=True)
+def compute_features(price):
+    """Build the (len(price), 21) feature matrix in prediction_bot.FEATURES order."""
+    n = price.shape[0]
+    features = np.empty((n, 21))
+    
+    # Price changes
+    features[:, 0] = _pct_change(price, 1)
+    features[:, 1] = features[:, 0]
+    features[:, 2] = _pct_change(price, 2)
+    features[:, 3] = _pct_change(price, 3)
+    features[:, 4] = _pct_change(price, 5)
+    
+    # Moving averages and crossovers
+    ma_5 = _rolling_mean(price, 5, 0)
+    ma_10 = _rolling_mean(price, 10, 0)
+    ma_20 = _rolling_mean(price, 20, 0)
+    features[:, 5] = ma_5
+    features[:, 6] = ma_10
+    features[:, 7] = _rolling_mean(price, 15, 0)
+    features[:, 8] = ma_20
+    features[:, 9] = ma_5 / ma_10
+    features[:, 10] = ma_10 / ma_20
+    
+    # Volatility
+    features[:, 11] = _rolling_std(price, 5, ma_5)
+    features[:, 12] = _rolling_std(price, 10, ma_10)
+    
+    # Rate of change
+    features[:, 13] = features[:, 4] * 100
+    features[:, 14] = _pct_change(price, 10) * 100
+    
+    # Simple RSI over 14-bar mean gain/loss
+    features[:, 15] = rsi(price, 14)
+    
+    # MACD
+    macd = _ewm(price, 12) - _ewm(price, 26)
+    macd_signal = _ewm(macd, 9)
+    features[:, 16] = macd
+    features[:, 17] = macd_signal
+    features[:, 18] = macd - macd_signal
+    
+    # Price distance from moving averages (as percentage)
+    features[:, 19] = (price / ma_5 - 1) * 100
+    features[:, 20] = (price / ma_10 - 1) * 100
+    
+    return features
+
+# Compile at import so the first prediction doesn't pay for it
+compute_features(np.linspace(1.0, 2.0, 30))
@@ -0,0 +1,95 @@
+"""
+bots/_forest_numba.py
+Numba-compiled scorer for a fitted tree-ensemble classifier on the per-tick prediction path.
+Importing this module raises ImportError when Numba is not installed.
+"""
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def predict_forest(feature, threshold, left, right, value, x):
+    """Average the leaf probabilities reached by x in every tree (same as predict_proba)."""
+    total = 0.0
+    for t in range(feature.shape[0]):
+        node = 0
+        while left[t, node] != -1:
+            if x[feature[t, node]] <= threshold[t, node]:
+                node = left[t, node]
+            else:
+                node = right[t, node]
+        total += value[t, node]
+    return total / feature.shape[0]
+
+class PackedForest:
+    """A fitted StandardScaler + Random/ExtraTreesClassifier reduced to flat float32/int32 arrays."""
+    
+    ARRAYS = ('mean', 'scale', 'feature', 'threshold', 'left', 'right', 'value')
+    
+    def __init__(self, mean, scale, feature, threshold, left, right, value):
+        self.mean = mean
+        self.scale = scale
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.n_features_in_ = len(mean)
+    
+    @classmethod
+    def from_sklearn(cls, model, scaler, class_index=1):
+        """Pack the trees of a fitted forest classifier into padded (n_trees, n_nodes) arrays.
+        
+        value holds each leaf's probability of model.classes_[class_index].
+        """
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        shape = (len(trees), max(tree.node_count for tree in trees))
+        
+        feature = np.zeros(shape, dtype=np.int32)
+        threshold = np.zeros(shape, dtype=np.float32)
+        left = np.full(shape, -1, dtype=np.int32)
+        right = np.full(shape, -1, dtype=np.int32)
+        value = np.zeros(shape, dtype=np.float32)
+        
+        for i, tree in enumerate(trees):
+            n = tree.node_count
+            feature[i, :n] = tree.feature
+            left[i, :n] = tree.children_left
+            right[i, :n] = tree.children_right
+            
+            # sklearn compares float32 inputs against float64 thresholds. Rounding
+            # each threshold down to float32 gives the same split for every float32 x
+            thr = tree.threshold
+            thr32 = thr.astype(np.float32)
+            too_high = thr32 > thr
+            thr32[too_high] = np.nextafter(thr32[too_high], np.float32(-np.inf))
+            threshold[i, :n] = thr32
+            
+            # Normalize so this works whether the tree stores counts or fractions
+            counts = tree.value[:, 0, :]
+            value[i, :n] = counts[:, class_index] / counts.sum(axis=1)
+        
+        n_features = model.n_features_in_
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+        return cls(mean.astype(np.float64), scale.astype(np.float64),
+                   feature, threshold, left, right, value)
+    
+    @classmethod
+    def load(cls, path):
+        """Load a forest written by save()."""
+        with np.load(path) as data:
+            return cls(*(data[name] for name in cls.ARRAYS))
+    
+    def save(self, path):
+        """Write the packed arrays to a compressed .npz file."""
+        np.savez_compressed(path, **{name: getattr(self, name) for name in self.ARRAYS})
+    
+    def predict_up_probability(self, features):
+        """Scale one feature vector like StandardScaler.transform and return P(class 1)."""
+        x = ((np.asarray(features, dtype=np.float64) - self.mean) / self.scale).astype(np.float32)
+        return predict_forest(self.feature, self.threshold, self.left, self.right, self.value, x)
+
+# Compile at import so the first prediction doesn't pay for it
+predict_forest(np.zeros((1, 1), dtype=np.int32), np.zeros((1, 1), dtype=np.float32),
+               np.full((1, 1), -1, dtype=np.int32), np.full((1, 1), -1, dtype=np.int32),
+               np.zeros((1, 1), dtype=np.float32), np.zeros(1, dtype=np.float32))
@@ -0,0 +1,62 @@
+"""
+bots/_price_cache.py
+Process-wide cache of the parsed price history CSV shared by the bots.
+"""
+import io
+import os
+import numpy as np
+import pandas as pd
+
+# path -> [(mtime_ns, size), DataFrame as read, the same with parsed timestamps or None]
+_cache = {}
+
+def open_sequential(path, mode='rb', **kwargs):
+    """Open a file that will be read front to back, asking the kernel for a larger readahead."""
+    f = open(path, mode, **kwargs)
+    if hasattr(os, 'posix_fadvise'):  # Not available on Windows/macOS
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return f
+
+def get_price_data(path, parse_dates=True):
+    """Return the price history at `path` as a DataFrame, re-parsing only when the file changes.
+    
+    With parse_dates=False the timestamp column is left as read, so a caller
+    that only needs prices isn't failed by a malformed timestamp. The returned
+    DataFrame is shared between callers and must not be modified in place.
+    """
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    
+    cached = _cache.get(path)
+    if cached is None or cached[0] != key:
+        with open_sequential(path) as f:
+            cached = [key, pd.read_csv(f, float_precision='round_trip'), None]
+        _cache[path] = cached
+    
+    if not parse_dates:
+        return cached[1]
+    if cached[2] is None:
+        # Timestamps are converted once per file version, on first request
+        cached[2] = cached[1].assign(timestamp=pd.to_datetime(cached[1]['timestamp']))
+    return cached[2]
+
+def read_recent_prices(path, block_size=65536):
+    """Return the prices from the last `block_size` bytes of the price history as a float array.
+    
+    Cost is bounded by the block size however long the file grows; all complete
+    rows inside the block are parsed.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        start = max(0, f.tell() - block_size)
+        f.seek(start)
+        tail = f.read()
+    
+    # Drop the header, or the partial row we seeked into the middle of
+    tail = tail[tail.find(b'\n') + 1:]
+    if not tail.strip():
+        return np.empty(0)
+    
+    prices = pd.read_csv(io.BytesIO(tail), header=None, names=['timestamp', 'price'],
+                         usecols=['price'], float_precision='round_trip')['price']
+    return prices.to_numpy(dtype=np.float64)
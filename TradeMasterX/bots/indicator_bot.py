@@ -5,10 +5,13 @@ IndicatorBot: Analyzes price data using moving averages to generate trading sign
 import random
 import datetime
 import os
+import io
 import csv
 import time
 import json
 import logging
+import numpy as np
+from bots._price_cache import get_price_data, open_sequential
 
 # For real-time data
 try:
@@ -16,6 +19,49 @@ try:
 except ImportError:
     requests = None
 
+class PriceRingBuffer:
+    """Fixed-size ring buffer holding the most recent prices in a NumPy array."""
+    
+    def __init__(self, size):
+        self._buf = np.zeros(size, dtype=np.float64)
+        self._pos = 0  # Next write position
+        self._count = 0
+    
+    def __len__(self):
+        return self._count
+    
+    def __iter__(self):
+        return iter(self.recent(self._count).tolist())
+    
+    def __getitem__(self, index):
+        """Return a price by negative index (-1 is the most recent)."""
+        if not -self._count <= index < 0:
+            raise IndexError('PriceRingBuffer only supports negative indices within its length')
+        return float(self._buf[(self._pos + index) % len(self._buf)])
+    
+    def append(self, price):
+        """Add a price, overwriting the oldest one once the buffer is full.
+        
+        Returns True when the write wrapped around to the start of the buffer.
+        """
+        self._buf[self._pos] = price
+        self._pos = (self._pos + 1) % len(self._buf)
+        self._count = min(self._count + 1, len(self._buf))
+        return self._pos == 0
+    
+    def extend(self, prices):
+        """Append several prices in order."""
+        for price in prices:
+            self.append(price)
+    
+    def recent(self, window):
+        """Return the last `window` prices, oldest first (a view unless it wraps around)."""
+        window = min(window, self._count)
+        start = self._pos - window
+        if start >= 0:
+            return self._buf[start:self._pos]
+        return np.concatenate((self._buf[start:], self._buf[:self._pos]))
+
 class IndicatorBot:
     def __init__(self, use_real_data=False):
         """Initialize the IndicatorBot with price history and moving average settings.
@@ -23,15 +69,24 @@ class IndicatorBot:
         Args:
             use_real_data (bool): If True, fetch real cryptocurrency price data from API
         """
-        self.price_history = []
+        self.max_history = 100  # Prices kept in memory and after compacting the CSV
+        self.price_history = PriceRingBuffer(self.max_history)  # Oldest price drops off automatically
         self.short_window = 5  # Short moving average window
         self.long_window = 10  # Long moving average window
         self.history_file = os.path.join('data', 'price_history.csv')
         self.use_real_data = use_real_data
+        self._session = requests.Session() if requests is not None else None  # Keep-alive for API calls
+        self._rows_since_compaction = 0  # Rows appended to the CSV beyond max_history
+        
+        # Running sums of the last short_window/long_window prices
+        self._short_sum = 0.0
+        self._long_sum = 0.0
         
         # Create a simulated price history if none exists
         if not self._load_price_history():
             self._generate_price_history()
+        
+        self._reset_running_sums()
     
     def _load_price_history(self):
         """Load price history from CSV file. Returns True if successful."""
@@ -42,51 +97,113 @@ class IndicatorBot:
             return False
             
         try:
-            with open(self.history_file, 'r') as f:
-                reader = csv.reader(f)
-                next(reader)  # Skip header
-                for row in reader:
-                    timestamp, price = row
-                    self.price_history.append(float(price))
+            # Shares the parsed copy with PatternBot; timestamps are never used here
+            prices = get_price_data(self.history_file, parse_dates=False)['price']
+            self.price_history.extend(prices.tolist())
+            self._rows_since_compaction = max(0, len(prices) - self.max_history)
             return True
         except Exception:
             return False
     
     def _generate_price_history(self):
         """Generate simulated price history if no real data is available."""
-        # Start with a base price
-        price = 10000.0  # Starting price ($10,000)
-        
-        # Create a realistic price series with some trend and volatility
-        for _ in range(100):  # Generate 100 data points
-            # Add some random movement (-2% to +2%)
-            change = random.uniform(-0.02, 0.02)
-            price = price * (1 + change)
-            self.price_history.append(price)
+        # Create a realistic price series with some trend and volatility:
+        # 100 random movements (-2% to +2%) compounded from a $10,000 start
+        changes = np.random.uniform(-0.02, 0.02, size=self.max_history)
+        prices = 10000.0 * np.cumprod(1.0 + changes)
+        self.price_history.extend(prices.tolist())
             
         # Save the generated data
-        self._save_price_history()
+        self._init_history_file()
+    
+    def _write_history_file(self, rows):
+        """Atomically replace the CSV file with the given header and rows."""
+        # Build the whole file in memory so it is written with a single call
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['timestamp', 'price'])
+        writer.writerows(rows)
+        
+        # Write to a temporary file and swap it in so concurrent readers
+        # (PatternBot, PredictionBot) never see a truncated file
+        tmp_path = self.history_file + '.tmp'
+        with open(tmp_path, 'w', newline='') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, self.history_file)
+        
+        self._rows_since_compaction = 0
     
-    def _save_price_history(self):
-        """Save price history to CSV file."""
+    def _init_history_file(self):
+        """Write the whole in-memory price history to a fresh CSV file."""
         if not os.path.exists('data'):
             os.makedirs('data')
             
-        with open(self.history_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['timestamp', 'price'])
-              # Generate timestamps starting from 100 days ago
-            base_date = datetime.datetime.now() - datetime.timedelta(days=100)
-            for i, price in enumerate(self.price_history):
-                date = base_date + datetime.timedelta(days=i)
-                writer.writerow([date.isoformat(), price])
+        # Generate timestamps starting from 100 days ago
+        base_date = datetime.datetime.now() - datetime.timedelta(days=100)
+        self._write_history_file(
+            [(base_date + datetime.timedelta(days=i)).isoformat(), price]
+            for i, price in enumerate(self.price_history)
+        )
+    
+    def _compact_price_history(self):
+        """Rewrite the CSV keeping only the most recent max_history rows."""
+        with open_sequential(self.history_file, 'r', newline='') as f:
+            reader = csv.reader(f)
+            next(reader)  # Skip header
+            rows = list(reader)
+        
+        self._write_history_file(rows[-self.max_history:])
+    
+    def _save_price_history(self, new_price):
+        """Append the newest price to the CSV file, compacting it periodically."""
+        # Append mode opens at the end of the file, so position 0 means it was missing
+        # or empty; that replaces a separate exists() check on every tick
+        with open(self.history_file, 'a', newline='') as f:
+            is_new = f.tell() == 0
+            if not is_new:
+                csv.writer(f).writerow([datetime.datetime.now().isoformat(), new_price])
+        
+        if is_new:
+            self._init_history_file()
+            return
+        
+        # Trim the file back to max_history rows once it has doubled in size
+        self._rows_since_compaction += 1
+        if self._rows_since_compaction >= self.max_history:
+            self._compact_price_history()
+    
+    def _reset_running_sums(self):
+        """Recompute the moving average running sums from the full price history."""
+        self._short_sum = float(self.price_history.recent(self.short_window).sum())
+        self._long_sum = float(self.price_history.recent(self.long_window).sum())
+    
+    def _append_price(self, new_price):
+        """Append a price and update the running sums."""
+        wrapped = self.price_history.append(new_price)
+        
+        # Add the new price and drop the one that fell out of each window
+        self._short_sum += new_price
+        self._long_sum += new_price
+        if len(self.price_history) > self.short_window:
+            self._short_sum -= self.price_history[-(self.short_window + 1)]
+        if len(self.price_history) > self.long_window:
+            self._long_sum -= self.price_history[-(self.long_window + 1)]
+        
+        # Recompute the sums each time the buffer wraps so float rounding can't accumulate
+        if wrapped:
+            self._reset_running_sums()
     
     def _calculate_moving_average(self, window):
         """Calculate moving average for the given window size."""
         if len(self.price_history) < window:
             return None
         
-        return sum(self.price_history[-window:]) / window
+        if window == self.short_window:
+            return self._short_sum / window
+        if window == self.long_window:
+            return self._long_sum / window
+        
+        return float(self.price_history.recent(window).sum()) / window
     
     def _update_price(self, coin='bitcoin'):
         """Add a new price point based on real data or simulation.
@@ -94,12 +211,12 @@ class IndicatorBot:
         Args:
             coin (str): The cryptocurrency to fetch price data for
         """
-        if self.use_real_data and requests is not None:
+        if self.use_real_data and self._session is not None:
             # Use real API to fetch cryptocurrency price
             try:
                 # Use CoinGecko API (free, no API key needed)
                 url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin}&vs_currencies=usd"
-                response = requests.get(url, timeout=10)
+                response = self._session.get(url, timeout=10)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -124,19 +241,15 @@ class IndicatorBot:
             return self._simulate_price_update()
             
         # Add the new price to history
-        self.price_history.append(new_price)
-        
-        # Keep only the most recent 100 prices
-        if len(self.price_history) > 100:
-            self.price_history = self.price_history[-100:]
+        self._append_price(new_price)
             
         # Update the saved history
-        self._save_price_history()
+        self._save_price_history(new_price)
         
     def _simulate_price_update(self):
         """Simulate a price update based on the previous trend with some noise."""
         if not self.price_history:
-            self.price_history.append(10000.0)  # Start at $10,000 if no history
+            self._append_price(10000.0)  # Start at $10,000 if no history
             return
         
         last_price = self.price_history[-1]
@@ -145,14 +258,10 @@ class IndicatorBot:
         new_price = last_price * (1 + change)
         
         # Add the new price to history
-        self.price_history.append(new_price)
-        
-        # Keep only the most recent 100 prices
-        if len(self.price_history) > 100:
-            self.price_history = self.price_history[-100:]
+        self._append_price(new_price)
             
         # Update the saved history
-        self._save_price_history()
+        self._save_price_history(new_price)
     
     def get_signal(self):
         """Generate a signal based on moving average crossover strategy."""
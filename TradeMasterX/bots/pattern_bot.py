@@ -3,8 +3,102 @@ bots/pattern_bot.py
 PatternBot: Identifies candlestick patterns in price data to generate signals.
 """
 import os
-import pandas as pd
 import numpy as np
+from bots._price_cache import get_price_data
+
+# Compile the detector kernels to native code if Numba is available
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _jit(func):
+    """Compile func with Numba when installed, otherwise run it as plain Python."""
+    return njit(cache=True)(func) if njit is not None else func
+
+@_jit
+def _local_extrema(normalized, window, maxima):
+    """Return indices (into `normalized`) of local extrema of the rolling min/max."""
+    size = normalized.shape[0] - window + 1
+    rolling = np.empty(size)
+    for i in range(size):
+        segment = normalized[i:i + window]
+        rolling[i] = segment.max() if maxima else segment.min()
+    
+    mid, left, right = rolling[1:-1], rolling[:-2], rolling[2:]
+    if maxima:
+        mask = (left < mid) & (mid > right)
+    else:
+        mask = (left > mid) & (mid < right)
+    
+    # +1 for the trimmed left neighbour, +(window - 1) for the rolling window offset
+    return np.flatnonzero(mask) + window
+
+@_jit
+def _double_bottom_kernel(normalized):
+    """Detect a double bottom in a normalized 15-point window."""
+    # Find local minima of the rolling minimum with window size 5
+    local_minima = _local_extrema(normalized, 5, False)
+    
+    # Need at least 2 minima for double bottom
+    if len(local_minima) < 2:
+        return False
+    
+    # The last two minima must be separated by at least 3 data points, be
+    # close in price (within 15%) and we must have started moving up from
+    # the second minimum
+    last_min1 = local_minima[-1]
+    last_min2 = local_minima[-2]
+    return (
+        last_min1 - last_min2 >= 3
+        and abs(normalized[last_min1] - normalized[last_min2]) < 0.15
+        and normalized[-1] > normalized[last_min1]
+    )
+
+@_jit
+def _double_top_kernel(normalized):
+    """Detect a double top in a normalized 15-point window."""
+    # Find local maxima of the rolling maximum with window size 5
+    local_maxima = _local_extrema(normalized, 5, True)
+    
+    # Need at least 2 maxima for double top
+    if len(local_maxima) < 2:
+        return False
+    
+    # The last two maxima must be separated by at least 3 data points, be
+    # close in price (within 15%) and we must have started moving down from
+    # the second maximum
+    last_max1 = local_maxima[-1]
+    last_max2 = local_maxima[-2]
+    return (
+        last_max1 - last_max2 >= 3
+        and abs(normalized[last_max1] - normalized[last_max2]) < 0.15
+        and normalized[-1] < normalized[last_max1]
+    )
+
+@_jit
+def _head_and_shoulders_kernel(normalized):
+    """Detect a head and shoulders in a normalized 20-point window."""
+    # Find local maxima of the rolling maximum with window size 3
+    local_maxima = _local_extrema(normalized, 3, True)
+    
+    # Need at least 3 maxima for head and shoulders
+    if len(local_maxima) < 3:
+        return False
+    
+    # Get the last three maxima
+    left_val = normalized[local_maxima[-3]]
+    head_val = normalized[local_maxima[-2]]
+    right = local_maxima[-1]
+    right_val = normalized[right]
+    
+    # Head should be higher than shoulders, shoulders should be at similar
+    # heights (within 20%) and the pattern should be recent (right shoulder near end)
+    return (
+        head_val > left_val and head_val > right_val
+        and abs(left_val - right_val) < 0.2
+        and len(normalized) - right < 5
+    )
 
 class PatternBot:
     def __init__(self, use_real_data=False):
@@ -16,6 +110,7 @@ class PatternBot:
         self.price_history_path = os.path.join('data', 'price_history.csv')
         self.min_pattern_size = 5  # Minimum data points needed for pattern detection
         self.use_real_data = use_real_data
+        self._signal_cache = None  # ((mtime_ns, size) of the price file, signal)
         
     def _load_price_data(self):
         """Load price history from CSV file."""
@@ -23,144 +118,59 @@ class PatternBot:
             return None
             
         try:
-            df = pd.read_csv(self.price_history_path)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            return df
+            return get_price_data(self.price_history_path)
         except Exception as e:
             print(f"Error loading price data: {str(e)}")
             return None
     
+    @staticmethod
+    def _normalize(prices, size):
+        """Scale the last `size` prices into the 0-1 range."""
+        window = np.asarray(prices, dtype=np.float64)[-size:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (window - window.min()) / (window.max() - window.min())
+    
     def _detect_double_bottom(self, prices):
         """Detect double bottom pattern (W-shape) - bullish reversal pattern."""
         if len(prices) < 15:
             return False
-            
-        # Take the last 15 prices for pattern detection
-        window = prices[-15:].copy()
-        
-        # Normalize prices for easier pattern detection
-        normalized = (window - window.min()) / (window.max() - window.min())
-        
-        # Calculate rolling minimum with window size 5
-        rolling_min = normalized.rolling(window=5).min().dropna()
-        
-        # Find local minima indices
-        local_minima = []
-        for i in range(1, len(rolling_min) - 1):
-            if rolling_min.iloc[i-1] > rolling_min.iloc[i] < rolling_min.iloc[i+1]:
-                local_minima.append(i + 4)  # +4 because of rolling window offset
-        
-        # Need at least 2 minima for double bottom
-        if len(local_minima) < 2:
-            return False
-        
-        # Check if the last two minima are within 20% of each other's value
-        # and separated by at least 3 data points
-        last_min1 = local_minima[-1]
-        last_min2 = local_minima[-2]
-        
-        if last_min1 - last_min2 >= 3:
-            price1 = normalized.iloc[last_min1]
-            price2 = normalized.iloc[last_min2]
-            
-            # Check if prices are close (within 15%)
-            if abs(price1 - price2) < 0.15:
-                # Check if we've started moving up from the second minimum
-                if normalized.iloc[-1] > normalized.iloc[last_min1]:
-                    return True
-        
-        return False
+        return bool(_double_bottom_kernel(self._normalize(prices, 15)))
     
     def _detect_double_top(self, prices):
         """Detect double top pattern (M-shape) - bearish reversal pattern."""
         if len(prices) < 15:
             return False
-            
-        # Take the last 15 prices for pattern detection
-        window = prices[-15:].copy()
-        
-        # Normalize prices for easier pattern detection
-        normalized = (window - window.min()) / (window.max() - window.min())
-        
-        # Calculate rolling maximum with window size 5
-        rolling_max = normalized.rolling(window=5).max().dropna()
-        
-        # Find local maxima indices
-        local_maxima = []
-        for i in range(1, len(rolling_max) - 1):
-            if rolling_max.iloc[i-1] < rolling_max.iloc[i] > rolling_max.iloc[i+1]:
-                local_maxima.append(i + 4)  # +4 because of rolling window offset
-        
-        # Need at least 2 maxima for double top
-        if len(local_maxima) < 2:
-            return False
-        
-        # Check if the last two maxima are within 20% of each other's value
-        # and separated by at least 3 data points
-        last_max1 = local_maxima[-1]
-        last_max2 = local_maxima[-2]
-        
-        if last_max1 - last_max2 >= 3:
-            price1 = normalized.iloc[last_max1]
-            price2 = normalized.iloc[last_max2]
-            
-            # Check if prices are close (within 15%)
-            if abs(price1 - price2) < 0.15:
-                # Check if we've started moving down from the second maximum
-                if normalized.iloc[-1] < normalized.iloc[last_max1]:
-                    return True
-        
-        return False
+        return bool(_double_top_kernel(self._normalize(prices, 15)))
 
     def _detect_head_and_shoulders(self, prices):
         """Detect head and shoulders pattern - bearish reversal pattern."""
         if len(prices) < 20:
             return False
-            
-        window = prices[-20:].copy()
-        normalized = (window - window.min()) / (window.max() - window.min())
-        
-        # Calculate rolling maximum with window size 3
-        rolling_max = normalized.rolling(window=3).max().dropna()
-        
-        # Find local maxima indices
-        local_maxima = []
-        for i in range(1, len(rolling_max) - 1):
-            if rolling_max.iloc[i-1] < rolling_max.iloc[i] > rolling_max.iloc[i+1]:
-                local_maxima.append(i + 2)  # +2 because of rolling window offset
+        return bool(_head_and_shoulders_kernel(self._normalize(prices, 20)))
+    
+    def get_signal(self):
+        """Return the trading signal, re-analyzing only when the price history has changed."""
+        try:
+            st = os.stat(self.price_history_path)
+        except FileNotFoundError:
+            return 'HOLD'  # No data for pattern detection
         
-        # Need at least 3 maxima for head and shoulders
-        if len(local_maxima) < 3:
-            return False
+        key = (st.st_mtime_ns, st.st_size)
+        if self._signal_cache is not None and self._signal_cache[0] == key:
+            return self._signal_cache[1]
         
-        # Get the last three maxima
-        if len(local_maxima) >= 3:
-            left = local_maxima[-3]
-            head = local_maxima[-2]
-            right = local_maxima[-1]
-            
-            left_val = normalized.iloc[left]
-            head_val = normalized.iloc[head]
-            right_val = normalized.iloc[right]
-            
-            # Head should be higher than shoulders
-            if head_val > left_val and head_val > right_val:
-                # Shoulders should be at similar heights (within 20%)
-                if abs(left_val - right_val) < 0.2:
-                    # Pattern should be recent (right shoulder near end)
-                    if len(normalized) - right < 5:
-                        return True
-        
-        return False
+        signal = self._analyze_patterns()
+        self._signal_cache = (key, signal)
+        return signal
     
-    def get_signal(self):
+    def _analyze_patterns(self):
         """Analyze price patterns and return trading signal."""
         df = self._load_price_data()
         
         if df is None or len(df) < self.min_pattern_size:
             return 'HOLD'  # Not enough data for pattern detection
         
-        prices = df['price']
+        prices = df['price'].to_numpy()
         
         # Check for double bottom (bullish)
         if self._detect_double_bottom(prices):
@@ -176,3 +186,11 @@ class PatternBot:
         
         # No clear pattern detected
         return 'HOLD'
+
+
+# Compile the kernels at import so the first signal doesn't pay for it
+if njit is not None:
+    _warmup = np.linspace(0.0, 1.0, 20)
+    _double_bottom_kernel(_warmup[-15:])
+    _double_top_kernel(_warmup[-15:])
+    _head_and_shoulders_kernel(_warmup)
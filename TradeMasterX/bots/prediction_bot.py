@@ -7,27 +7,58 @@ import random
 import numpy as np
 import pandas as pd
 import pickle
+import joblib
 import datetime
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
 from sklearn.preprocessing import StandardScaler
+from bots._price_cache import read_recent_prices
+
+# Model inputs in column order; shared by training, prediction and the Numba kernel
+FEATURES = (
+    'price_change', 'price_change_1d', 'price_change_2d', 'price_change_3d',
+    'price_change_5d', 'ma_5', 'ma_10', 'ma_15', 'ma_20', 'ma_5_10_ratio',
+    'ma_10_20_ratio', 'volatility_5', 'volatility_10', 'roc_5', 'roc_10',
+    'rsi', 'macd', 'macd_signal', 'macd_hist',
+    'price_ma_5_delta', 'price_ma_10_delta'
+)
+
+# Compiled feature kernel for the prediction path; fall back to pandas without Numba
+try:
+    from bots._features_numba import compute_features
+except ImportError:
+    compute_features = None
+
+# Compiled scorer for RandomForest models; fall back to predict_proba without Numba
+try:
+    from bots._forest_numba import PackedForest
+except ImportError:
+    PackedForest = None
 
 class PredictionBot:
     def __init__(self):
         """Initialize the PredictionBot with ML model."""
         self.model_path = os.path.join('prediction_model.pkl')
+        self.packed_model_path = os.path.join('prediction_model.npz')
         self.price_history_path = os.path.join('data', 'price_history.csv')
         self.model = None
         self.scaler = StandardScaler()
+        self._feature_cache = None  # ((mtime_ns, size) of the price file, features)
+        self._compiled_forest = None  # (model, scaler, PackedForest or None)
+        self._scaler_params = None  # (scaler, mean, scale) snapshot of the fitted scaler
         
         # Load existing model or create a new one
         self.load_or_train_model()
         
     def load_or_train_model(self):
         """Load existing model or train a new one if none exists."""
+        if self._load_packed_model():
+            return True
+        
         if os.path.exists(self.model_path):
             try:
-                with open(self.model_path, 'rb') as f:
-                    model_data = pickle.load(f)
+                # joblib.load reads both the compressed file from train_prediction_model.py
+                # and the plain pickle train_model() writes
+                model_data = joblib.load(self.model_path)
                 # If the file is a dict (from train_prediction_model.py), load model and scaler
                 if isinstance(model_data, dict) and 'model' in model_data and 'scaler' in model_data:
                     self.model = model_data['model']
@@ -45,6 +76,27 @@ class PredictionBot:
         print("Training new prediction model...")
         return self.train_model()
     
+    def _load_packed_model(self):
+        """Load the packed forest if it is at least as new as the pickle. Returns True if loaded."""
+        if PackedForest is None or not os.path.exists(self.packed_model_path):
+            return False
+        
+        # train_prediction_model.py only rewrites the pickle, which then takes precedence
+        if (os.path.exists(self.model_path)
+                and os.path.getmtime(self.model_path) > os.path.getmtime(self.packed_model_path)):
+            return False
+        
+        try:
+            forest = PackedForest.load(self.packed_model_path)
+        except Exception as e:
+            print(f"Could not load packed model: {str(e)}")
+            return False
+        
+        self.model = forest
+        self._compiled_forest = (forest, self.scaler, forest)
+        print("Loaded packed prediction model.")
+        return True
+    
     def train_model(self):
         """Train a simple prediction model using historical price data."""
         try:
@@ -72,21 +124,26 @@ class PredictionBot:
             df = df.dropna()
             
             # Split features and target
-            features = ['price_change', 'ma_5', 'ma_10', 'std_5', 'rsi']
-            X = df[features].values
+            X = df[list(FEATURES)].values
             y = df['target'].values
             
             # Scale features
             X = self.scaler.fit_transform(X)
             
-            # Train model
-            model = RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42)
+            # Train model (extremely randomized trees draw split thresholds instead of
+            # searching sorted values, so they fit faster than a random forest)
+            model = ExtraTreesClassifier(n_estimators=50, max_depth=5, random_state=42)
             model.fit(X, y)
             
-            # Save model
+            # Save model and scaler in the same format as train_prediction_model.py
             self.model = model
             with open(self.model_path, 'wb') as f:
-                pickle.dump(model, f)
+                pickle.dump({'model': model, 'scaler': self.scaler, 'feature_columns': list(FEATURES)}, f)
+            
+            # Also save the packed arrays, which load faster and without sklearn's pickle format
+            forest = self._get_compiled_forest()
+            if forest is not None:
+                forest.save(self.packed_model_path)
                 
             print("Model trained and saved.")
             return True
@@ -99,7 +156,7 @@ class PredictionBot:
         df = df.copy()
         # Price changes
         df['price_change'] = df['price'].pct_change()
-        df['price_change_1d'] = df['price'].pct_change(periods=1)
+        df['price_change_1d'] = df['price_change']  # Same as price_change; kept for trained models
         df['price_change_2d'] = df['price'].pct_change(periods=2)
         df['price_change_3d'] = df['price'].pct_change(periods=3)
         df['price_change_5d'] = df['price'].pct_change(periods=5)
@@ -141,9 +198,21 @@ class PredictionBot:
         """Make predictions using the trained model."""
         if self.model is None:
             return None
+        
+        forest = self._get_compiled_forest()
+        if forest is not None and len(features) == forest.n_features_in_:
+            return forest.predict_up_probability(features)
             
-        # Scale the features
-        features = self.scaler.transform([features])
+        # Scale the features (inline when the scaler is fitted, skipping sklearn's validation).
+        # Models saved without a scaler (histogram boosting from train_prediction_model.py) take raw features
+        params = self._get_scaler_params()
+        if self.scaler is None:
+            features = np.asarray(features, dtype=np.float64)[np.newaxis, :]
+        elif params is not None and len(features) == len(params[0]):
+            mean, scale = params
+            features = ((np.asarray(features, dtype=np.float64) - mean) / scale)[np.newaxis, :]
+        else:
+            features = self.scaler.transform([features])
         
         # Predict probability of price increase
         probabilities = self.model.predict_proba(features)[0]
@@ -153,45 +222,78 @@ class PredictionBot:
             return probabilities[1]
         return 0.5  # Default to 50% if something is wrong
     
+    def _get_scaler_params(self):
+        """Return the (mean, scale) arrays of the current fitted StandardScaler, or None."""
+        cached = self._scaler_params
+        if cached is not None and cached[0] is self.scaler:
+            return cached[1:]
+        
+        if not hasattr(self.scaler, 'scale_'):
+            return None  # Not fitted; let transform() raise as usual
+        
+        n_features = self.scaler.n_features_in_
+        mean = self.scaler.mean_ if self.scaler.mean_ is not None else np.zeros(n_features)
+        scale = self.scaler.scale_ if self.scaler.scale_ is not None else np.ones(n_features)
+        self._scaler_params = (self.scaler, mean, scale)
+        return mean, scale
+    
+    def _get_compiled_forest(self):
+        """Return the PackedForest for the current model and scaler, or None.
+        
+        Only fitted random/extra-trees forests are compiled; anything else
+        (e.g. the HistGradientBoosting model from train_prediction_model.py) uses predict_proba.
+        """
+        if PackedForest is None:
+            return None
+        
+        cached = self._compiled_forest
+        if cached is not None and cached[0] is self.model and cached[1] is self.scaler:
+            return cached[2]
+        
+        compiled = None
+        if (isinstance(self.model, (RandomForestClassifier, ExtraTreesClassifier)) and hasattr(self.model, 'estimators_')
+                and len(self.model.classes_) >= 2 and hasattr(self.scaler, 'scale_')):
+            compiled = PackedForest.from_sklearn(self.model, self.scaler)
+        
+        self._compiled_forest = (self.model, self.scaler, compiled)
+        return compiled
+    
+    def invalidate(self):
+        """Drop the cached feature vector so the next call recomputes it."""
+        self._feature_cache = None
+    
     def get_latest_data(self):
-        """Get the latest price data for prediction (21 features)."""
-        if not os.path.exists(self.price_history_path):
+        """Get the latest FEATURES vector for prediction."""
+        try:
+            st = os.stat(self.price_history_path)
+        except FileNotFoundError:
             return None
+        
+        # The price file usually hasn't changed since the previous tick
+        key = (st.st_mtime_ns, st.st_size)
+        if self._feature_cache is not None and self._feature_cache[0] == key:
+            return self._feature_cache[1]
+        
         try:
-            df = pd.read_csv(self.price_history_path)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            if len(df) < 26:  # Need enough data for all features
+            # Only the tail of the file is read, so this doesn't grow with the history
+            prices = read_recent_prices(self.price_history_path)
+            if len(prices) < 26:  # Need enough data for all features
                 return None
-            df = self.create_features(df)
-            latest_data = df.iloc[-1]
-            features = [
-                latest_data['price_change'],
-                latest_data['price_change_1d'],
-                latest_data['price_change_2d'],
-                latest_data['price_change_3d'],
-                latest_data['price_change_5d'],
-                latest_data['ma_5'],
-                latest_data['ma_10'],
-                latest_data['ma_15'],
-                latest_data['ma_20'],
-                latest_data['ma_5_10_ratio'],
-                latest_data['ma_10_20_ratio'],
-                latest_data['volatility_5'],
-                latest_data['volatility_10'],
-                latest_data['roc_5'],
-                latest_data['roc_10'],
-                latest_data['rsi'],
-                latest_data['macd'],
-                latest_data['macd_signal'],
-                latest_data['macd_hist'],
-                latest_data['price_ma_5_delta'],
-                latest_data['price_ma_10_delta']
-            ]
+            features = self._compute_latest_features(prices)
+            self._feature_cache = (key, features)
             return features
         except Exception as e:
             print(f"Error getting latest data: {str(e)}")
             return None
     
+    def _compute_latest_features(self, prices):
+        """Compute the FEATURES vector for the last of the given prices."""
+        if compute_features is not None:
+            return compute_features(prices)[-1]
+        
+        df = self.create_features(pd.DataFrame({'price': prices}))
+        return df[list(FEATURES)].iloc[-1].to_numpy()
+    
     def get_signal(self):
         """Return a trading signal based on ML prediction."""
         # If we have no model or can't load data, fall back to random
@@ -7,18 +7,27 @@ import os
 import json
 import time
 import requests
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
 
+# Keyword pools for the sample data (object arrays so Generator.choice returns plain str)
+POSITIVE_WORDS = np.array(['bullish', 'surge', 'gains', 'rise', 'breakthrough', 'adoption', 'potential'], dtype=object)
+NEGATIVE_WORDS = np.array(['bearish', 'drop', 'crash', 'regulation', 'ban', 'risk', 'bubble'], dtype=object)
+NEUTRAL_WORDS = np.array(['price', 'market', 'crypto', 'blockchain', 'trading', 'transaction'], dtype=object)
+
 class SentimentBot:
-    def __init__(self):
+    def __init__(self, seed=None):
+        """Initialize the SentimentBot.
+        
+        Args:
+            seed (int, optional): Seed for generating reproducible sample data
+        """
         self.logger = logging.getLogger('SentimentBot')
         self.logger.info("Initializing SentimentBot")
-        self.sentiment_cache = {}
-        self.cache_time = {}
-        self.cache_duration = 3600  # 1 hour cache duration
+        self._rng = np.random.default_rng(seed)
+        self.cache_duration = 300  # Seconds a computed signal stays valid
+        self._signal_cache = {}  # coin -> (monotonic time, date, signal)
         
         # Set up data directory
         self.data_dir = os.path.join('data', 'sentiment')
@@ -26,12 +35,21 @@ class SentimentBot:
             os.makedirs(self.data_dir)
             
         # Load example data for offline simulation
-        self.sample_data_file = os.path.join(self.data_dir, 'sample_sentiment_data.json')
+        self.sample_data_file = os.path.join(self.data_dir, 'sample_sentiment_data.npz')
+        self.legacy_sample_data_file = os.path.join(self.data_dir, 'sample_sentiment_data.json')
         self._ensure_sample_data()
+        self._load_sample_data()
     
     def _ensure_sample_data(self):
-        """Create sample sentiment data if it doesn't exist."""
-        if not os.path.exists(self.sample_data_file):
+        """Create sample sentiment data if it doesn't exist, converting the old JSON file if present."""
+        if os.path.exists(self.sample_data_file):
+            return
+        
+        if os.path.exists(self.legacy_sample_data_file):
+            self.logger.info("Converting sample sentiment data from JSON")
+            with open(self.legacy_sample_data_file, 'r') as f:
+                sample_data = json.load(f)
+        else:
             self.logger.info("Creating sample sentiment data")
             # Generate some realistic looking sample data
             sample_data = {
@@ -41,15 +59,65 @@ class SentimentBot:
                 'ripple': self._generate_sample_sentiment_data(bias=0.45),   # Slightly negative bias
                 'dogecoin': self._generate_sample_sentiment_data(volatility=0.8)  # More volatile sentiment
             }
-            with open(self.sample_data_file, 'w') as f:
-                json.dump(sample_data, f, indent=2)
+        
+        self._save_sample_data(sample_data)
+    
+    def _save_sample_data(self, sample_data):
+        """Write each coin's records to the .npz file as one array per field."""
+        arrays = {}
+        for coin, records in sample_data.items():
+            arrays[f'{coin}__date'] = np.array([item['date'] for item in records], dtype='datetime64[D]')
+            arrays[f'{coin}__source'] = np.array([item['source'] for item in records], dtype=str)
+            arrays[f'{coin}__sentiment_score'] = np.array([item['sentiment_score'] for item in records], dtype=np.float64)
+            arrays[f'{coin}__volume'] = np.array([item['volume'] for item in records], dtype=np.int64)
+            # Keyword lists are stored comma-joined so the array needs no pickling
+            arrays[f'{coin}__keywords'] = np.array([','.join(item['keywords']) for item in records], dtype=str)
+        
+        # Write to a temporary file and swap it in so a reload never sees a partial file
+        tmp_path = self.sample_data_file + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, self.sample_data_file)
+    
+    def _load_sample_data(self):
+        """Load the sample data once into per-coin arrays sorted by date."""
+        self._coin_data = {}
+        self._coin_details = {}
+        self._signal_cache = {}
+        self._sample_mtime = None
+        
+        try:
+            self._sample_mtime = os.stat(self.sample_data_file).st_mtime_ns
+            with np.load(self.sample_data_file) as data:
+                columns = {name: data[name] for name in data.files}
+        except Exception as e:
+            self.logger.error(f"Error loading sample sentiment data: {e}")
+            return
+        
+        for coin in {name.rsplit('__', 1)[0] for name in columns}:
+            dates = columns[f'{coin}__date']
+            
+            # Sorted dates let the cutoff be found with a binary search
+            order = np.argsort(dates, kind='stable')
+            self._coin_data[coin] = (dates[order], columns[f'{coin}__sentiment_score'][order],
+                                     columns[f'{coin}__volume'][order].astype(np.float64))
+            self._coin_details[coin] = (columns[f'{coin}__source'][order], columns[f'{coin}__keywords'][order])
+    
+    def _reload_if_changed(self):
+        """Reload the sample data (dropping cached signals) if the file was modified."""
+        try:
+            mtime = os.stat(self.sample_data_file).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._sample_mtime:
+            self._load_sample_data()
     
     def _generate_sample_sentiment_data(self, days=30, bias=0.5, volatility=0.5):
         """Generate realistic sample sentiment data with the given bias and volatility."""
         date_range = [(datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)]
         
         # Generate sentiment scores with some trend and volatility
-        base_scores = np.cumsum(np.random.normal(0, volatility, days)) / 10
+        base_scores = np.cumsum(self._rng.normal(0, volatility, days)) / 10
         sentiment_scores = base_scores + bias
         
         # Clip values to be between 0 and 1
@@ -62,14 +130,14 @@ class SentimentBot:
         for i, date in enumerate(date_range):
             for source in sources:
                 # Add some variation per source
-                source_bias = np.random.normal(0, 0.1)
+                source_bias = self._rng.normal(0, 0.1)
                 score = min(max(sentiment_scores[i] + source_bias, 0), 1)
                 
                 data.append({
                     'date': date,
                     'source': source,
                     'sentiment_score': float(score),
-                    'volume': int(np.random.randint(100, 10000)),
+                    'volume': int(self._rng.integers(100, 10000)),
                     'keywords': self._get_sample_keywords(score)
                 })
         
@@ -77,76 +145,87 @@ class SentimentBot:
     
     def _get_sample_keywords(self, score):
         """Generate sample keywords based on sentiment score."""
-        positive_words = ['bullish', 'surge', 'gains', 'rise', 'breakthrough', 'adoption', 'potential']
-        negative_words = ['bearish', 'drop', 'crash', 'regulation', 'ban', 'risk', 'bubble']
-        neutral_words = ['price', 'market', 'crypto', 'blockchain', 'trading', 'transaction']
-        
         # Select words based on sentiment score
         keywords = []
-        keywords.extend(np.random.choice(neutral_words, size=3, replace=False))
+        keywords.extend(self._rng.choice(NEUTRAL_WORDS, size=3, replace=False))
         
         if score > 0.6:  # Positive sentiment
-            keywords.extend(np.random.choice(positive_words, size=2, replace=False))
+            keywords.extend(self._rng.choice(POSITIVE_WORDS, size=2, replace=False))
         elif score < 0.4:  # Negative sentiment
-            keywords.extend(np.random.choice(negative_words, size=2, replace=False))
+            keywords.extend(self._rng.choice(NEGATIVE_WORDS, size=2, replace=False))
         else:  # Neutral
-            keywords.append(np.random.choice(positive_words, size=1)[0])
-            keywords.append(np.random.choice(negative_words, size=1)[0])
+            keywords.append(self._rng.choice(POSITIVE_WORDS))
+            keywords.append(self._rng.choice(NEGATIVE_WORDS))
             
         return keywords
         
+    def _recent_start(self, coin, days):
+        """Return the index of the first of a coin's records within the last few days."""
+        cutoff_date = np.datetime64((datetime.now() - timedelta(days=days)).date())
+        return np.searchsorted(self._coin_data[coin][0], cutoff_date, side='left')
+    
     def get_sentiment_data(self, coin='bitcoin', days=7):
         """Get sentiment data for a specific coin over the last few days."""
-        cache_key = f"{coin}_{days}"
-        
-        # Check cache first
-        now = time.time()
-        if cache_key in self.sentiment_cache and now - self.cache_time.get(cache_key, 0) < self.cache_duration:
-            self.logger.debug(f"Using cached sentiment data for {coin}")
-            return self.sentiment_cache[cache_key]
-        
-        try:
-            # In a real implementation, we would call an API here
-            # For now, we'll use our sample data
-            with open(self.sample_data_file, 'r') as f:
-                all_data = json.load(f)
-                
-            if coin not in all_data:
-                self.logger.warning(f"No sentiment data available for {coin}")
-                return []
-                
-            # Filter by date
-            cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-            filtered_data = [item for item in all_data[coin] if item['date'] >= cutoff_date]
-            
-            # Cache the result
-            self.sentiment_cache[cache_key] = filtered_data
-            self.cache_time[cache_key] = now
-            
-            return filtered_data
-            
-        except Exception as e:
-            self.logger.error(f"Error fetching sentiment data: {e}")
+        # In a real implementation, we would call an API here
+        # For now, we'll use our sample data
+        if coin not in self._coin_data:
+            self.logger.warning(f"No sentiment data available for {coin}")
             return []
+        
+        start = self._recent_start(coin, days)
+        dates, scores, volumes = self._coin_data[coin]
+        sources, keywords = self._coin_details[coin]
+        return [
+            {'date': date, 'source': source, 'sentiment_score': score,
+             'volume': int(volume), 'keywords': words.split(',') if words else []}
+            for date, source, score, volume, words in zip(
+                dates[start:].astype(str).tolist(), sources[start:].tolist(), scores[start:].tolist(),
+                volumes[start:].tolist(), keywords[start:].tolist())
+        ]
+    
+    def _get_sentiment_arrays(self, coin='bitcoin', days=7):
+        """Get the same data as get_sentiment_data as aligned (dates, scores, volumes) arrays, oldest first."""
+        if coin not in self._coin_data:
+            self.logger.warning(f"No sentiment data available for {coin}")
+            return np.empty(0, dtype='datetime64[D]'), np.empty(0), np.empty(0)
+        
+        start = self._recent_start(coin, days)
+        dates, scores, volumes = self._coin_data[coin]
+        return dates[start:], scores[start:], volumes[start:]
     
     def analyze_sentiment(self, coin='bitcoin'):
+        """Return the trading signal for a coin, reusing it for up to cache_duration seconds."""
+        self._reload_if_changed()
+        
+        # The signal depends on the current date, so a new day invalidates it too
+        now = time.monotonic()
+        today = datetime.now().date()
+        cached = self._signal_cache.get(coin)
+        if cached is not None and cached[1] == today and now - cached[0] < self.cache_duration:
+            return cached[2]
+        
+        signal = self._compute_signal(coin)
+        self._signal_cache[coin] = (now, today, signal)
+        return signal
+    
+    def _compute_signal(self, coin):
         """Analyze sentiment data and determine a trading signal."""
-        sentiment_data = self.get_sentiment_data(coin)
+        dates, scores, volumes = self._get_sentiment_arrays(coin)
         
-        if not sentiment_data:
+        if scores.size == 0:
             self.logger.warning(f"No sentiment data to analyze for {coin}")
             return 'HOLD'  # Default to HOLD if no data
             
         # Calculate sentiment metrics
-        df = pd.DataFrame(sentiment_data)
-        avg_sentiment = df['sentiment_score'].mean()
-        recent_sentiment = df[df['date'] >= (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')]['sentiment_score'].mean()
+        avg_sentiment = scores.mean()
+        recent_mask = dates >= np.datetime64((datetime.now() - timedelta(days=1)).date())
+        recent_sentiment = scores[recent_mask].mean() if recent_mask.any() else avg_sentiment
         
         # Calculate sentiment change
         sentiment_change = recent_sentiment - avg_sentiment
         
         # Calculate weighted sentiment score
-        volume_weighted_sentiment = (df['sentiment_score'] * df['volume']).sum() / df['volume'].sum()
+        volume_weighted_sentiment = np.dot(scores, volumes) / volumes.sum()
         
         # Determine signal based on sentiment
         signal = 'HOLD'
@@ -3,7 +3,14 @@ bots/signal_bot.py
 SignalBot: Generates a random signal for demonstration.
 """
 import random
+
+SIGNALS = ('BUY', 'SELL', 'HOLD')
+
 class SignalBot:
+    def __init__(self):
+        """Initialize the SignalBot with its own random generator."""
+        self._rng = random.Random()  # Not shared with other bots' threads
+    
     def get_signal(self):
         """Return a random signal: BUY, SELL, or HOLD."""
-        return random.choice(['BUY', 'SELL', 'HOLD'])
+        return SIGNALS[self._rng.randrange(3)]
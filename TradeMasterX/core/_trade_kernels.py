@@ -0,0 +1,50 @@
+"""
+core/_trade_kernels.py
+Array-based trade replay behind TradeExecutor.replay, for backtests.
+"""
+import numpy as np
+
+# Compile the kernels to native code if Numba is available
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _jit(func):
+    """Compile func with Numba when installed, otherwise run it as plain Python."""
+    return njit(cache=True)(func) if njit is not None else func
+
+# Action codes for replay_trades
+HOLD = 0
+BUY = 1
+SELL = -1
+ACTION_CODES = {'BUY': BUY, 'SELL': SELL, 'HOLD': HOLD}
+
+@_jit
+def apply_trade(cash, holding, price, action, buy_fraction, sell_fraction):
+    """Apply one trade at price and return (new_cash, new_holding, trade_amount).
+    
+    BUY spends buy_fraction of the cash, SELL sells sell_fraction of the holding,
+    anything else leaves the position unchanged.
+    """
+    if action == BUY:
+        cash_to_spend = cash * buy_fraction
+        trade_amount = cash_to_spend / price
+        return cash - cash_to_spend, holding + trade_amount, trade_amount
+    if action == SELL:
+        trade_amount = holding * sell_fraction
+        return cash + trade_amount * price, holding - trade_amount, trade_amount
+    return cash, holding, 0.0
+
+@_jit
+def replay_trades(actions, prices, cash, holding, buy_fraction, sell_fraction):
+    """Replay a series of actions on one coin and return the portfolio value after each step.
+    
+    Each step depends on the previous cash and holding, so this runs as one
+    sequential native loop rather than in parallel.
+    """
+    values = np.empty(prices.shape[0])
+    for i in range(prices.shape[0]):
+        cash, holding, _ = apply_trade(cash, holding, prices[i], actions[i], buy_fraction, sell_fraction)
+        values[i] = cash + holding * prices[i]
+    return values
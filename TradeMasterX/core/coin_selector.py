@@ -4,6 +4,7 @@ Utility for selecting which coin to trade based on various strategies.
 """
 import random
 import time
+import numpy as np
 
 class CoinSelector:
     def __init__(self, coins=['bitcoin'], strategy='round_robin'):
@@ -18,9 +19,11 @@ class CoinSelector:
         self.current_index = 0
         self.last_selection = None
         self.last_selection_time = 0
+        self._rng = random.Random()  # Instance generator rather than the module-level one
         
         # Performance tracking (could be used for weighted selection)
         self.performance = {coin: 1.0 for coin in coins}  # Default equal weights
+        self._cum_weights = {}  # tuple(coin_list) -> normalized cumulative weights (None if all zero)
     
     def select_coin(self):
         """Select a coin for trading based on the chosen strategy.
@@ -63,27 +66,24 @@ class CoinSelector:
             return selected
             
         elif self.strategy == 'random':
-            return random.choice(coin_list)
+            return self._rng.choice(coin_list)
             
         elif self.strategy == 'weighted':
-            # Get weights for the coins in the list
-            weights = [self.performance.get(coin, 1.0) for coin in coin_list]
-            # Normalize weights
-            total = sum(weights)
-            if total == 0:
-                return random.choice(coin_list)
-            norm_weights = [w/total for w in weights]
+            # Cumulative weights only change when performance is updated
+            key = tuple(coin_list)
+            if key not in self._cum_weights:
+                weights = np.fromiter((self.performance.get(coin, 1.0) for coin in coin_list),
+                                      dtype=np.float64, count=len(coin_list))
+                total = weights.sum()
+                self._cum_weights[key] = np.cumsum(weights) / total if total != 0 else None
             
-            # Use weighted random choice
-            r = random.random()
-            cumulative = 0
-            for i, w in enumerate(norm_weights):
-                cumulative += w
-                if r <= cumulative:
-                    return coin_list[i]
+            cum_weights = self._cum_weights[key]
+            if cum_weights is None:
+                return self._rng.choice(coin_list)
             
-            # Fallback
-            return coin_list[-1]
+            # Use weighted random choice: first coin whose cumulative weight reaches r
+            index = int(np.searchsorted(cum_weights, self._rng.random(), side='left'))
+            return coin_list[min(index, len(coin_list) - 1)]
         
         # Default to first coin if invalid strategy
         return coin_list[0]
@@ -98,3 +98,4 @@ class CoinSelector:
         if coin in self.performance:
             # Exponential moving average to smooth performance changes
             self.performance[coin] = 0.7 * self.performance[coin] + 0.3 * performance_value
+            self._cum_weights.clear()
@@ -14,6 +14,12 @@ import csv
 import time
 import sys
 import logging
+import queue
+import atexit
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 
 # Import notification system if available
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -24,6 +30,26 @@ except ImportError:
     def notify(level, message, force=False):
         print(f"[{level}] {message}")
 
+def _enable_queued_logging():
+    """Move the root logger's handlers behind a queue so logging calls only enqueue.
+    
+    Formatting and file I/O then happen on the QueueListener's thread, so bots
+    logging from their price update paths don't block. Must run after
+    basicConfig, which is a no-op once the root logger has a handler.
+    """
+    root = logging.getLogger()
+    if not root.handlers or any(isinstance(h, QueueHandler) for h in root.handlers):
+        return
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    
+    listener.start()
+    atexit.register(listener.stop)  # Flush queued records on shutdown
+
 class MasterBot:
     def __init__(self, config=None):
         """Initialize all bots and trade executor.
@@ -54,6 +80,7 @@ class MasterBot:
             level=log_level,
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
+        _enable_queued_logging()  # Keep file I/O off the bots' update paths
         
         # Initialize bots with configuration
         self.bots = [
@@ -63,6 +90,10 @@ class MasterBot:
             SentimentBot(),
             PredictionBot()
         ]
+        self.bot_names = ('Indicator', 'Pattern', 'Signal', 'Sentiment', 'Prediction')
+        
+        # Per-cycle signal summary, built once: "Signals: [...] [Indicator: X, Pattern: Y, ...]"
+        self._signal_template = 'Signals: {} [' + ', '.join(f'{name}: {{}}' for name in self.bot_names) + ']'
         
         # Initialize trade executor with configuration
         self.trade_executor = TradeExecutor(
@@ -78,6 +109,23 @@ class MasterBot:
         
         self.log_path = os.path.join('logs', 'system.log')
         self.control_path = os.path.join('commands', 'control.txt')
+        self._control_cache = None  # ((mtime_ns, size) of control.txt, command)
+        
+        # Activity goes through the system.log handler set up above, which keeps the
+        # file open; INFO regardless of log_level so it is always recorded as before
+        self._logger = logging.getLogger('MasterBot')
+        self._logger.setLevel(logging.INFO)
+        
+        # Repeated errors only get a full traceback every traceback_interval seconds
+        self.traceback_interval = 30
+        self._last_traceback = {}  # exception type -> monotonic time of its last traceback
+        
+        # Bots are independent apart from the price file, so poll them concurrently
+        self._pool = ThreadPoolExecutor(max_workers=len(self.bots), thread_name_prefix='bot')
+        atexit.register(self._pool.shutdown)
+        
+        # Set by stop() to end run() from another thread
+        self._stop_event = threading.Event()
         
         # Log initialization
         coins_str = ', '.join(self.config['coins'])
@@ -86,16 +134,74 @@ class MasterBot:
 
     def log(self, message):
         """Log system activity to system.log."""
-        with open(self.log_path, 'a') as f:
-            f.write(message + '\n')
+        self._logger.info(message)
+
+    def stop(self):
+        """Ask run() to return after the current cycle; safe to call from any thread."""
+        self._stop_event.set()
+
+    def close(self):
+        """Shut down the bot thread pool and close the trade executor once run() has returned."""
+        atexit.unregister(self._pool.shutdown)
+        self._pool.shutdown()
+        self.trade_executor.close()
 
     def check_control(self):
-        """Check control.txt for pause/resume commands."""
-        if not os.path.exists(self.control_path):
+        """Check control.txt for pause/resume commands, re-reading it only when it changes."""
+        try:
+            st = os.stat(self.control_path)
+        except FileNotFoundError:
             return 'RUN'
+        
+        key = (st.st_mtime_ns, st.st_size)
+        if self._control_cache is not None and self._control_cache[0] == key:
+            return self._control_cache[1]
+        
         with open(self.control_path, 'r') as f:
             cmd = f.read().strip().upper()
-        return cmd if cmd in ['PAUSE', 'RUN'] else 'RUN'
+        cmd = cmd if cmd in ['PAUSE', 'RUN'] else 'RUN'
+        self._control_cache = (key, cmd)
+        return cmd
+    
+    @staticmethod
+    def _run_after(prerequisite, func):
+        """Wait for another future to finish, then call func."""
+        prerequisite.exception()  # Any error is raised from the prerequisite's own result()
+        return func()
+    
+    @staticmethod
+    def _consensus(signals):
+        """Tally the signals in one pass and return (direction, votes), or (None, 0) without 3 votes."""
+        buys = sells = 0
+        for signal in signals:
+            if signal == 'BUY':
+                buys += 1
+            elif signal == 'SELL':
+                sells += 1
+        
+        # BUY takes precedence, as before (both can only reach 3 with 6+ bots)
+        if buys >= 3:
+            return 'BUY', buys
+        if sells >= 3:
+            return 'SELL', sells
+        return None, 0
+    
+    def _collect_signals(self):
+        """Run every bot's get_signal on the thread pool and return the signals in bot order."""
+        # IndicatorBot appends this cycle's price, so the bots that read the
+        # price file wait for it; the rest start right away
+        price_update = None
+        futures = []
+        for bot in self.bots:
+            if isinstance(bot, IndicatorBot):
+                price_update = self._pool.submit(bot.get_signal)
+                futures.append(price_update)
+            elif isinstance(bot, (PatternBot, PredictionBot)) and price_update is not None:
+                futures.append(self._pool.submit(self._run_after, price_update, bot.get_signal))
+            else:
+                futures.append(self._pool.submit(bot.get_signal))
+        
+        return [future.result() for future in futures]
         
     def run(self):
         """Main loop: run bots, aggregate signals, and execute trades if consensus."""
@@ -103,71 +209,68 @@ class MasterBot:
         notify('INFO', 'MasterBot starting trading operations')
         
         try:
-            while True:
+            while not self._stop_event.is_set():
                 try:
                     if self.check_control() == 'PAUSE':
                         message = 'System paused by control.txt'
                         print(message)
                         self.log(message)
-                        time.sleep(2)
+                        self._stop_event.wait(2)
                         continue
                         
                     # Get signals from all bots
-                    signals = [bot.get_signal() for bot in self.bots]
-                    bot_names = ['Indicator', 'Pattern', 'Signal', 'Sentiment', 'Prediction']
+                    signals = self._collect_signals()
                     
-                    # Log detailed signal information
-                    signal_detail = ", ".join([f"{bot_names[i]}: {signals[i]}" for i in range(len(signals))])
-                    message = f"Signals: {signals} [{signal_detail}]"
+                    # Log detailed signal information (the message is printed too, so always built)
+                    message = self._signal_template.format(signals, *signals)
                     print(message)
                     self.log(message)
                     
                     # Count consensus
-                    trade_executed = False
-                    for direction in ['BUY', 'SELL']:
-                        if signals.count(direction) >= 3:
-                            # Use coin selector to choose which coin to trade
-                            selected_coin = self.coin_selector.select_coin()
-                            
-                            # Execute trade and get trade details
-                            trade_result = self.trade_executor.execute_trade(direction, selected_coin)
-                            
-                            # Format a detailed message
-                            message = f"Trade executed: {direction} {selected_coin} (consensus: {signals.count(direction)}/5)"
-                            
-                            # Add portfolio details if available
-                            if isinstance(trade_result, dict) and 'portfolio_value' in trade_result:
-                                message += f", Portfolio: ${trade_result['portfolio_value']:.2f}"
-                                
-                                # Update coin performance if trade was successful
-                                if 'portfolio' in trade_result and selected_coin in trade_result['portfolio']:
-                                    # Simple performance metric: more holdings is better
-                                    performance = trade_result['portfolio'][selected_coin]
-                                    self.coin_selector.update_performance(selected_coin, performance)
+                    direction, votes = self._consensus(signals)
+                    if direction is not None:
+                        # Use coin selector to choose which coin to trade
+                        selected_coin = self.coin_selector.select_coin()
+                        
+                        # Execute trade and get trade details
+                        trade_result = self.trade_executor.execute_trade(direction, selected_coin)
+                        
+                        # Format a detailed message
+                        message = f"Trade executed: {direction} {selected_coin} (consensus: {votes}/5)"
+                        
+                        # Add portfolio details if available
+                        if isinstance(trade_result, dict) and 'portfolio_value' in trade_result:
+                            message += f", Portfolio: ${trade_result['portfolio_value']:.2f}"
                             
-                            print(message)
-                            self.log(message)
-                            notify('TRADE', message)
-                            trade_executed = True
-                            break
-                    
-                    if not trade_executed:
+                            # Update coin performance if trade was successful
+                            if 'portfolio' in trade_result and selected_coin in trade_result['portfolio']:
+                                # Simple performance metric: more holdings is better
+                                performance = trade_result['portfolio'][selected_coin]
+                                self.coin_selector.update_performance(selected_coin, performance)
+                        
+                        print(message)
+                        self.log(message)
+                        notify('TRADE', message)
+                    else:
                         print("No consensus reached. No trade executed.")
                     
-                    # Wait before next cycle
-                    time.sleep(2)
+                    # Wait before next cycle (returns early on stop())
+                    self._stop_event.wait(2)
                     
                 except Exception as e:
                     error_message = f"Error in main loop: {str(e)}"
                     print(error_message)
-                    self.log(error_message)
                     notify('ERROR', error_message)
                     
-                    import traceback
-                    traceback_text = traceback.format_exc()
-                    print(traceback_text)
-                    self.log(traceback_text)
-                    time.sleep(5)  # Wait before retrying
+                    # Format the traceback only for the first of a burst of the same error
+                    now = time.monotonic()
+                    if now - self._last_traceback.get(type(e), float('-inf')) >= self.traceback_interval:
+                        self._last_traceback[type(e)] = now
+                        traceback.print_exc(file=sys.stdout)  # Printed next to the error line, as before
+                        self._logger.exception(error_message)
+                    else:
+                        self._logger.error(error_message)
+                    self._stop_event.wait(5)  # Wait before retrying
                     
         except KeyboardInterrupt:
             print("\nMasterBot stopped by user.")
@@ -8,6 +8,17 @@ import datetime
 import sqlite3
 import sys
 import json
+import time
+import atexit
+import queue
+import threading
+import numpy as np
+
+# Faster C JSON serializer for the portfolio backup if available
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add parent directory to path to allow imports from root
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -20,17 +31,57 @@ except ImportError:
     def notify(level, message, force=False):
         print(f"[{level}] {message}")
 
+def _read_last_row(path, block_size=4096):
+    """Return the fields of the last data row of a CSV file, or None if it has no rows.
+    
+    Reads backwards from the end in blocks, so the cost doesn't depend on file size.
+    """
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        tail = b''
+        while pos > 0:
+            pos = max(0, pos - block_size)
+            f.seek(pos)
+            tail = f.read(end - pos)
+            # Stop once the block holds a complete last line
+            if b'\n' in tail.rstrip(b'\r\n'):
+                break
+    
+    tail = tail.rstrip(b'\r\n')
+    if b'\n' not in tail:
+        return None  # Empty file or only the header
+    last_line = tail.rsplit(b'\n', 1)[1].decode('utf-8')
+    return next(csv.reader([last_line]), None)
+
 class TradeExecutor:
-    def __init__(self, coins=['bitcoin'], use_real_data=False):
+    # Per-trade statements, kept as constants so every call passes the identical
+    # SQL string and hits the connection's prepared-statement cache
+    INSERT_TRADE = ('INSERT INTO trades (timestamp, coin, action, price, amount, portfolio_cash, portfolio_value) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)')
+    INSERT_PORTFOLIO = 'INSERT INTO portfolio (timestamp, cash, value) VALUES (?, ?, ?)'
+    INSERT_HOLDING = 'INSERT INTO coin_holdings (portfolio_id, coin, amount) VALUES (?, ?, ?)'
+    BUY_FRACTION = 0.2  # Share of cash spent on each buy
+    SELL_FRACTION = 0.5  # Share of a coin's holding sold on each sell
+    
+    def __init__(self, coins=['bitcoin'], use_real_data=False, batch=False):
         """Initialize trade executor with portfolio tracking and logging.
         
         Args:
             coins (list): List of cryptocurrencies to trade
             use_real_data (bool): Whether to use real market data
+            batch (bool): Queue trade rows in memory and write them to the
+                database in one transaction on flush() instead of per trade
         """
         self.trades_log = os.path.join('logs', 'trades.log')
         self.history_csv = os.path.join('logs', 'trade_history.csv')
         self.db_path = os.path.join('trading_history.db')
+        self.portfolio_json = os.path.join('data', 'portfolio.json')
+        self.batch = batch
+        self._conn = None  # Long-lived database connection, opened in _init_database
+        self._pending_trades = []  # Trade rows waiting for flush() in batch mode
+        self._db_lock = threading.Lock()  # The writer thread and flush() share _conn
+        self.write_batch_size = 100  # Most trades the writer thread persists per transaction
         
         # Initialize portfolio with cash and each supported coin
         self.portfolio = {'cash': 10000.0}  # Start with $10,000
@@ -41,12 +92,31 @@ class TradeExecutor:
         self.default_coin = coins[0]  # First coin is the default
         self.coins = coins
         self.use_real_data = use_real_data
+        self.price_ttl = 30  # Seconds before current_prices are refreshed again
+        self._prices_fetched_at = None  # Monotonic time of the last refresh
+        self._portfolio_value = self.portfolio['cash']  # Cash + holdings at current_prices, kept up to date
+        
+        # Holdings and prices mirrored into parallel arrays (one slot per coin) so
+        # revaluing the portfolio is a single dot product; see _set_holding/_set_price
+        self._coin_index = {coin: i for i, coin in enumerate(dict.fromkeys(coins))}
+        self._holdings_arr = np.zeros(len(self._coin_index), dtype=np.float64)
+        self._prices_arr = np.full(len(self._coin_index), 10000.0, dtype=np.float64)
         
         # Set up API for real data if enabled
+        self.http = None
         if use_real_data:
             try:
                 import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
                 self.requests = requests
+                
+                # Keep-alive session so price requests reuse the TLS connection, with
+                # short backoff retries for rate limits and server errors
+                retries = Retry(total=2, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504),
+                                raise_on_status=False)
+                self.http = requests.Session()
+                self.http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
             except ImportError:
                 self.use_real_data = False
                 notify('WARNING', 'Requests library not available. Falling back to simulated data.')
@@ -63,10 +133,23 @@ class TradeExecutor:
             with open(self.history_csv, 'w', newline='') as f:
                 writer = csv.writer(f)
                 writer.writerow(['timestamp', 'action', 'coin', 'price', 'amount', 'portfolio_value'])
+        
+        # Keep both trade logs open; the writer thread flushes them after each batch
+        self._trades_log_fh = open(self.trades_log, 'a')
+        self._history_csv_fh = open(self.history_csv, 'a', newline='')
+        self._history_csv_writer = csv.writer(self._history_csv_fh)
                 
         # Initialize database
         self._init_database()
         
+        # execute_trade only queues its log lines and database rows; this thread
+        # writes them out in batches so trading never waits on disk I/O
+        self._write_queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_worker, name='TradeWriter', daemon=True)
+        self._writer.start()
+        self._closed = False  # Set by close(); no trades are accepted afterwards
+        atexit.register(self.close)
+        
         # Load portfolio if it exists
         self._load_portfolio()
         
@@ -76,13 +159,23 @@ class TradeExecutor:
     def _init_database(self):
         """Initialize SQLite database for more robust storage."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # One connection for the executor's lifetime instead of one per write
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            cursor = self._conn.cursor()
+            
+            # Write-ahead logging with synchronous=NORMAL syncs on checkpoints rather
+            # than on every commit. A power loss can drop the last few trades, but
+            # the database stays consistent. WAL mode persists in the file itself
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('PRAGMA temp_store=MEMORY')
+            cursor.execute('PRAGMA mmap_size=268435456')  # 256 MB
+            cursor.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache
             
             # Create trades table if it doesn't exist
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 timestamp TEXT,
                 coin TEXT,
                 action TEXT,
@@ -106,7 +199,7 @@ class TradeExecutor:
             # Create coin_holdings table if it doesn't exist
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS coin_holdings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 portfolio_id INTEGER,
                 coin TEXT,
                 amount REAL,
@@ -114,16 +207,29 @@ class TradeExecutor:
             )
             ''')
             
-            conn.commit()
-            conn.close()
+            # idx_trades_action_ts lets the dashboard fetch one action's trades in timestamp
+            # order, idx_trades_ts_coin and idx_portfolio_ts serve the latest-trades and
+            # latest-portfolio queries and idx_holdings_pid_coin finds a snapshot's
+            # holdings, all without a full scan
+            for index_sql in (
+                'CREATE INDEX IF NOT EXISTS idx_trades_action_ts ON trades (action, timestamp)',
+                'CREATE INDEX IF NOT EXISTS idx_trades_ts_coin ON trades (timestamp, coin)',
+                'CREATE INDEX IF NOT EXISTS idx_portfolio_ts ON portfolio (timestamp)',
+                'CREATE INDEX IF NOT EXISTS idx_holdings_pid_coin ON coin_holdings (portfolio_id, coin)',
+            ):
+                try:
+                    cursor.execute(index_sql)
+                except sqlite3.OperationalError:
+                    pass  # A table from an older schema lacks the column
+            
+            self._conn.commit()
         except Exception as e:
             notify('ERROR', f"Database initialization error: {str(e)}")
     
     def _load_portfolio(self):
         """Load the latest portfolio state from the database."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._conn.cursor()
             
             # Get the latest portfolio entry for cash
             cursor.execute('SELECT cash FROM portfolio ORDER BY id DESC LIMIT 1')
@@ -140,26 +246,50 @@ class TradeExecutor:
                 coin_holdings = cursor.fetchall()
                 
                 for coin, amount in coin_holdings:
-                    if coin in self.portfolio:
-                        self.portfolio[coin] = amount
-            
-            conn.close()
+                    if coin in self._coin_index:
+                        self._set_holding(coin, amount)
         except Exception as e:
             notify('WARNING', f"Could not load portfolio: {str(e)}")
     
     def _update_current_price(self):
-        """Get the current price for all coins from API or CSV files."""
+        """Get the current price for all coins from API or CSV files, at most once per price_ttl."""
+        now = time.monotonic()
+        if self._prices_fetched_at is not None and now - self._prices_fetched_at < self.price_ttl:
+            return
+        self._prices_fetched_at = now
+        
+        self._fetch_current_prices()
+        
+        # Re-summing here, once per refresh, also clears any drift from the per-trade updates
+        self._portfolio_value = self._compute_portfolio_value()
+    
+    def _compute_portfolio_value(self):
+        """Return cash plus the value of all coin holdings at current_prices."""
+        return self.portfolio['cash'] + float(self._holdings_arr @ self._prices_arr)
+    
+    def _set_holding(self, coin, amount):
+        """Set a coin's holding in both the portfolio dict and the holdings array."""
+        self.portfolio[coin] = amount
+        self._holdings_arr[self._coin_index[coin]] = amount
+    
+    def _set_price(self, coin, price):
+        """Set a coin's price in both current_prices and the prices array."""
+        self.current_prices[coin] = price
+        self._prices_arr[self._coin_index[coin]] = price
+    
+    def _fetch_current_prices(self):
+        """Fill current_prices from the API, or from the per-coin CSV files as a fallback."""
         # Use real data if enabled
-        if self.use_real_data and self.requests:
+        if self.use_real_data and self.http is not None:
             try:
-                for coin in self.coins:
-                    # Try to get real price from CoinGecko API
-                    url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin}&vs_currencies=usd"
-                    response = self.requests.get(url, timeout=5)
-                    if response.status_code == 200:
-                        data = response.json()
+                # One CoinGecko request for every coin (ids are comma-separated)
+                url = f"https://api.coingecko.com/api/v3/simple/price?ids={','.join(self.coins)}&vs_currencies=usd"
+                response = self.http.get(url, timeout=5)
+                if response.status_code == 200:
+                    data = response.json()
+                    for coin in self.coins:
                         if coin in data and 'usd' in data[coin]:
-                            self.current_prices[coin] = data[coin]['usd']
+                            self._set_price(coin, data[coin]['usd'])
                 return
             except Exception as e:
                 notify('WARNING', f"Failed to get real-time price data: {str(e)}. Using historical/simulated data.")
@@ -170,66 +300,157 @@ class TradeExecutor:
             price_history_path = os.path.join('data', f'{coin}_price_history.csv')
             if os.path.exists(price_history_path):
                 try:
-                    with open(price_history_path, 'r') as f:
-                        reader = csv.reader(f)
-                        next(reader)  # Skip header
-                        
-                        # Get the last line (most recent price)
-                        last_row = None
-                        for row in reader:
-                            last_row = row
-                        
-                        # Update price if we have data
-                        if last_row and len(last_row) >= 2:
-                            self.current_prices[coin] = float(last_row[1])
+                    # Only the last line (most recent price) is read
+                    last_row = _read_last_row(price_history_path)
+                    
+                    # Update price if we have data
+                    if last_row and len(last_row) >= 2:
+                        self._set_price(coin, float(last_row[1]))
                 except Exception:
                     # If we can't read the file, keep the default price
                     pass
 
-    def _save_portfolio(self):
-        """Save the current portfolio state to the database."""
+    def _save_portfolio(self, snapshots, trade_rows=()):
+        """Save portfolio snapshots, and the trades behind them, to the database in one transaction.
+        
+        Args:
+            snapshots (list): (timestamp, cash, value, holdings) tuples, oldest first,
+                where holdings is a list of (coin, amount) pairs
+            trade_rows (list, optional): Trades to insert in the same transaction
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Calculate total portfolio value (cash + all coin values)
-            portfolio_value = self.portfolio['cash']
-            for coin in self.coins:
-                if coin in self.portfolio and coin in self.current_prices:
-                    portfolio_value += (self.portfolio[coin] * self.current_prices[coin])
-            
-            # Insert into portfolio table
-            cursor.execute(
-                'INSERT INTO portfolio (timestamp, cash, value) VALUES (?, ?, ?)',
-                (datetime.datetime.now().isoformat(), self.portfolio['cash'], portfolio_value)
-            )
-            
-            # Get the ID of the inserted portfolio entry
-            portfolio_id = cursor.lastrowid
-            
-            # Insert coin holdings
-            for coin in self.coins:
-                if coin in self.portfolio:
-                    cursor.execute(
-                        'INSERT INTO coin_holdings (portfolio_id, coin, amount) VALUES (?, ?, ?)',
-                        (portfolio_id, coin, self.portfolio[coin])
-                    )
+            with self._db_lock, self._conn:
+                cursor = self._conn.cursor()
+                
+                if self.batch:
+                    self._pending_trades.extend(trade_rows)
+                else:
+                    for trade_row in trade_rows:
+                        # A rejected trade row (e.g. an unmigrated schema) shouldn't
+                        # cost the portfolio snapshot, so report it and carry on
+                        try:
+                            cursor.execute(self.INSERT_TRADE, trade_row)
+                        except sqlite3.Error as e:
+                            notify('ERROR', f"Database error: {str(e)}")
+                
+                for timestamp, cash, portfolio_value, holdings in snapshots:
+                    # Insert into portfolio table
+                    cursor.execute(self.INSERT_PORTFOLIO, (timestamp, cash, portfolio_value))
+                    
+                    # Get the ID of the inserted portfolio entry
+                    portfolio_id = cursor.lastrowid
+                    
+                    # Insert coin holdings
+                    cursor.executemany(self.INSERT_HOLDING, [(portfolio_id, coin, amount) for coin, amount in holdings])
             
-            conn.commit()
-            conn.close()
+            # Save the latest snapshot to a JSON file as backup
+            timestamp, cash, portfolio_value, holdings = snapshots[-1]
+            portfolio_data = {
+                'timestamp': timestamp,
+                'cash': cash,
+                'coins': dict(holdings),
+                'value': portfolio_value
+            }
+            if orjson is not None:
+                payload = orjson.dumps(portfolio_data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(portfolio_data, indent=2).encode('utf-8')
             
-            # Save to a JSON file as backup
-            with open(os.path.join('data', 'portfolio.json'), 'w') as f:
-                portfolio_data = {
-                    'timestamp': datetime.datetime.now().isoformat(),
-                    'cash': self.portfolio['cash'],
-                    'coins': {coin: self.portfolio[coin] for coin in self.coins if coin in self.portfolio},
-                    'value': portfolio_value
-                }
-                json.dump(portfolio_data, f, indent=4)
+            # Write to a temporary file and swap it in so a crash mid-write
+            # never leaves a truncated backup
+            tmp_path = self.portfolio_json + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.portfolio_json)
                 
         except Exception as e:
             notify('ERROR', f"Failed to save portfolio: {str(e)}")
+    
+    def _write_records(self, records):
+        """Append a batch of trades to trades.log, trade_history.csv and the database."""
+        try:
+            self._trades_log_fh.write(''.join(record[0] for record in records))
+            self._trades_log_fh.flush()
+            self._history_csv_writer.writerows(record[1] for record in records)
+            self._history_csv_fh.flush()
+        except Exception as e:
+            notify('ERROR', f"Failed to write trade logs: {str(e)}")
+        
+        self._save_portfolio([record[3] for record in records], [record[2] for record in records])
+    
+    def _write_worker(self):
+        """Writer thread: persist queued trades in batches until close() sends None."""
+        while True:
+            # Block for the first record, then take whatever else is already waiting
+            records = [self._write_queue.get()]
+            while len(records) < self.write_batch_size:
+                try:
+                    records.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = records[-1] is None
+            trades = [record for record in records if record is not None]
+            if trades:
+                self._write_records(trades)
+            for _ in records:
+                self._write_queue.task_done()
+            if stop:
+                return
+    
+    def flush_logs(self):
+        """Block until the writer thread has written every queued trade."""
+        if self._writer.is_alive():
+            self._write_queue.join()
+    
+    def flush(self):
+        """Write queued trades out, including those held back in batch mode, and wait for it."""
+        self.flush_logs()
+        with self._db_lock:
+            if not self._pending_trades or self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(self.INSERT_TRADE, self._pending_trades)
+                self._pending_trades = []
+            except Exception as e:
+                notify('ERROR', f"Database error: {str(e)}")
+    
+    def close(self):
+        """Flush queued trades, stop the writer thread and close the database connection and log files."""
+        atexit.unregister(self.close)  # Nothing left for the exit handler to do
+        if self._closed:
+            return
+        self._closed = True
+        
+        if self._writer.is_alive():
+            self._write_queue.put(None)
+            self._writer.join()
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._trades_log_fh.close()
+        self._history_csv_fh.close()
+
+    def replay(self, actions, prices, cash=10000.0, holding=0.0):
+        """Replay actions on one coin at the given prices without logging or saving anything.
+        
+        Args:
+            actions (sequence): 'BUY', 'SELL' or 'HOLD' for each step
+            prices (sequence): The coin's price at each step
+            cash (float): Starting cash
+            holding (float): Starting amount of the coin
+            
+        Returns:
+            numpy.ndarray: Portfolio value after each step
+        """
+        # Imported here so only backtests load Numba and compile the kernels
+        from core._trade_kernels import ACTION_CODES, HOLD, replay_trades
+        
+        codes = np.array([ACTION_CODES.get(action, HOLD) for action in actions], dtype=np.int64)
+        return replay_trades(codes, np.asarray(prices, dtype=np.float64), float(cash), float(holding),
+                             self.BUY_FRACTION, self.SELL_FRACTION)
 
     def execute_trade(self, action, coin=None):
         """Simulate a trade and log it for a specific coin.
@@ -238,6 +459,10 @@ class TradeExecutor:
             action (str): 'BUY' or 'SELL'
             coin (str, optional): Specific coin to trade. If None, uses default_coin.
         """
+        if self._closed:
+            notify('ERROR', f"Cannot trade after the trade executor was closed: {action}")
+            return None
+        
         # Use specified coin or default
         coin = coin or self.default_coin
         if coin not in self.coins:
@@ -255,53 +480,34 @@ class TradeExecutor:
         # Execute the trade (update portfolio)
         trade_amount = 0.0
         if action == 'BUY':
-            # Use 20% of cash for each buy
-            cash_to_spend = self.portfolio['cash'] * 0.2
+            # Spend BUY_FRACTION of the cash
+            cash_to_spend = self.portfolio['cash'] * self.BUY_FRACTION
             trade_amount = cash_to_spend / current_price
             
             self.portfolio['cash'] -= cash_to_spend
-            self.portfolio[coin] += trade_amount
+            self._set_holding(coin, self.portfolio[coin] + trade_amount)
+            self._portfolio_value += trade_amount * current_price - cash_to_spend
             
         elif action == 'SELL':
-            # Sell 50% of coin holdings
-            trade_amount = self.portfolio[coin] * 0.5
+            # Sell SELL_FRACTION of the coin's holdings
+            trade_amount = self.portfolio[coin] * self.SELL_FRACTION
             cash_gained = trade_amount * current_price
             
             self.portfolio['cash'] += cash_gained
-            self.portfolio[coin] -= trade_amount
+            self._set_holding(coin, self.portfolio[coin] - trade_amount)
+            self._portfolio_value += cash_gained - trade_amount * current_price
         
-        # Calculate portfolio value
-        portfolio_value = self.portfolio['cash']
-        for c in self.coins:
-            portfolio_value += (self.portfolio[c] * self.current_prices[c])
-        
-        # Log to text file
-        with open(self.trades_log, 'a') as f:
-            log_message = f"{timestamp}: {action} {coin} {trade_amount:.6f} at ${current_price:.2f}, Portfolio: ${portfolio_value:.2f}\n"
-            f.write(log_message)
-        
-        # Log to CSV
-        with open(self.history_csv, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([timestamp, action, coin, current_price, trade_amount, portfolio_value])
-        
-        # Log to database
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                'INSERT INTO trades (timestamp, coin, action, price, amount, portfolio_cash, portfolio_value) VALUES (?, ?, ?, ?, ?, ?, ?)',
-                (timestamp, coin, action, current_price, trade_amount, self.portfolio['cash'], portfolio_value)
-            )
-            
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            notify('ERROR', f"Database error: {str(e)}")
+        # Only the traded coin and cash changed, so the running value is already current
+        portfolio_value = self._portfolio_value
+        cash = self.portfolio['cash']
         
-        # Save portfolio state
-        self._save_portfolio()
+        # Queue the text log line, the CSV row, the database row and a copy of the
+        # portfolio state, all under the trade's timestamp, for the writer thread
+        log_message = f"{timestamp}: {action} {coin} {trade_amount:.6f} at ${current_price:.2f}, Portfolio: ${portfolio_value:.2f}\n"
+        csv_row = [timestamp, action, coin, current_price, trade_amount, portfolio_value]
+        trade_row = (timestamp, coin, action, current_price, trade_amount, cash, portfolio_value)
+        holdings = list(zip(self._coin_index, self._holdings_arr.tolist()))
+        self._write_queue.put((log_message, csv_row, trade_row, (timestamp, cash, portfolio_value, holdings)))
         
         # Send notification
         trade_summary = f"Trade executed: {action} {coin} {trade_amount:.6f} at ${current_price:.2f}, Portfolio: ${portfolio_value:.2f}"
@@ -3,19 +3,30 @@ dashboard.py
 Creates a simple dashboard to visualize trading performance.
 """
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
 import sqlite3
-import matplotlib.dates as mdates
-import numpy as np
-import seaborn as sns
-from matplotlib.gridspec import GridSpec
+
+# pandas, NumPy, Matplotlib and seaborn are imported inside the functions that
+# use them, so importing this module stays cheap
+
+def _read_trades(conn, action):
+    """Read the timestamp and price of every trade with the given action, oldest first."""
+    import pandas as pd
+    
+    # Filtered in SQL (using idx_trades_action_ts) so only the plotted columns are loaded
+    return pd.read_sql(
+        'SELECT timestamp, price FROM trades WHERE action = ? ORDER BY timestamp',
+        conn, params=(action,), parse_dates=['timestamp']
+    )
 
 def load_data():
     """Load trading data from various sources."""
+    import pandas as pd
+    
     data = {
         'price_history': None,
-        'trades': None,
+        'buy_trades': None,
+        'sell_trades': None,
+        'trade_counts': None,  # Number of trades per action, indexed by action
         'portfolio': None
     }
     
@@ -23,8 +34,10 @@ def load_data():
     price_file = os.path.join('data', 'price_history.csv')
     if os.path.exists(price_file):
         try:
-            data['price_history'] = pd.read_csv(price_file)
-            data['price_history']['timestamp'] = pd.to_datetime(data['price_history']['timestamp'])
+            # Timestamps parsed while reading; float32 prices are plenty for plotting
+            data['price_history'] = pd.read_csv(
+                price_file, parse_dates=['timestamp'], dtype={'price': 'float32'}, engine='c'
+            )
         except Exception as e:
             print(f"Error loading price history: {str(e)}")
     
@@ -33,12 +46,14 @@ def load_data():
     if os.path.exists(db_file):
         try:
             conn = sqlite3.connect(db_file)
-            data['trades'] = pd.read_sql('SELECT * FROM trades', conn)
-            data['portfolio'] = pd.read_sql('SELECT * FROM portfolio', conn)
-            
-            # Convert timestamps
-            data['trades']['timestamp'] = pd.to_datetime(data['trades']['timestamp'])
-            data['portfolio']['timestamp'] = pd.to_datetime(data['portfolio']['timestamp'])
+            data['portfolio'] = pd.read_sql(
+                'SELECT timestamp, cash, value FROM portfolio ORDER BY id', conn, parse_dates=['timestamp']
+            )
+            data['buy_trades'] = _read_trades(conn, 'BUY')
+            data['sell_trades'] = _read_trades(conn, 'SELL')
+            data['trade_counts'] = pd.read_sql(
+                'SELECT action, COUNT(*) AS count FROM trades GROUP BY action', conn, index_col='action'
+            )['count']
             
             conn.close()
         except Exception as e:
@@ -48,8 +63,10 @@ def load_data():
             trade_file = os.path.join('logs', 'trade_history.csv')
             if os.path.exists(trade_file):
                 try:
-                    data['trades'] = pd.read_csv(trade_file)
-                    data['trades']['timestamp'] = pd.to_datetime(data['trades']['timestamp'])
+                    trades = pd.read_csv(trade_file, parse_dates=['timestamp'])
+                    data['buy_trades'] = trades.loc[trades['action'] == 'BUY', ['timestamp', 'price']]
+                    data['sell_trades'] = trades.loc[trades['action'] == 'SELL', ['timestamp', 'price']]
+                    data['trade_counts'] = trades['action'].value_counts().sort_index()
                 except Exception as e:
                     print(f"Error loading trade history: {str(e)}")
     
@@ -57,10 +74,16 @@ def load_data():
 
 def create_performance_dashboard(data):
     """Create a comprehensive performance dashboard."""
-    if not data['price_history'] is not None and not data['trades'] is not None:
+    if not data['price_history'] is not None and not data['trade_counts'] is not None:
         print("Not enough data available to create dashboard.")
         return
     
+    import numpy as np
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    import seaborn as sns
+    from matplotlib.gridspec import GridSpec
+    
     # Create figure layout
     fig = plt.figure(figsize=(16, 12))
     gs = GridSpec(3, 2, figure=fig)
@@ -76,25 +99,22 @@ def create_performance_dashboard(data):
         ax1.xaxis.set_major_locator(mdates.DayLocator(interval=5))
         
         # Add buy/sell markers if trade data exists
-        if data['trades'] is not None:
-            buy_trades = data['trades'][data['trades']['action'] == 'BUY']
-            sell_trades = data['trades'][data['trades']['action'] == 'SELL']
-            
-            # For each trade, find closest price point
-            for _, trade in buy_trades.iterrows():
-                trade_time = trade['timestamp']
-                price = trade['price']
-                ax1.scatter(trade_time, price, color='green', marker='^', s=100, label='_Buy')
+        if data['buy_trades'] is not None:
+            buy_trades = data['buy_trades']
+            sell_trades = data['sell_trades']
             
-            for _, trade in sell_trades.iterrows():
-                trade_time = trade['timestamp']
-                price = trade['price']
-                ax1.scatter(trade_time, price, color='red', marker='v', s=100, label='_Sell')
+            # One scatter call per action plots every marker at its trade price
+            ax1.scatter(buy_trades['timestamp'].to_numpy(), buy_trades['price'].to_numpy(),
+                        color='green', marker='^', s=100, label='_Buy')
+            ax1.scatter(sell_trades['timestamp'].to_numpy(), sell_trades['price'].to_numpy(),
+                        color='red', marker='v', s=100, label='_Sell')
         
-        # Add legend with unique entries
+        # Add legend with unique entries (first handle for each label)
         handles, labels = ax1.get_legend_handles_labels()
-        unique = [(h, l) for i, (h, l) in enumerate(zip(handles, labels)) if l not in labels[:i]]
-        ax1.legend(*zip(*unique))
+        unique = {}
+        for handle, label in zip(handles, labels):
+            unique.setdefault(label, handle)
+        ax1.legend(list(unique.values()), list(unique.keys()))
     
     ax1.set_title('Price Movement with Trade Signals')
     ax1.set_xlabel('Date')
@@ -115,11 +135,12 @@ def create_performance_dashboard(data):
     ax3 = fig.add_subplot(gs[1, 1])
     
     if data['portfolio'] is not None:
-        # Create stacked area chart for cash and crypto
-        ax3.fill_between(data['portfolio']['timestamp'], 0, data['portfolio']['cash'], label='Cash', alpha=0.7, color='green')
-        
-        crypto_value = data['portfolio']['crypto'] * data['portfolio']['value'] / (data['portfolio']['cash'] + data['portfolio']['crypto'])
-        ax3.fill_between(data['portfolio']['timestamp'], data['portfolio']['cash'], data['portfolio']['value'], label='Crypto', alpha=0.7, color='orange')
+        # Create stacked area chart for cash and crypto (crypto is the value above cash)
+        timestamps = data['portfolio']['timestamp'].to_numpy()
+        cash = data['portfolio']['cash'].to_numpy(dtype=np.float64)
+        value = data['portfolio']['value'].to_numpy(dtype=np.float64)
+        ax3.fill_between(timestamps, 0, cash, label='Cash', alpha=0.7, color='green')
+        ax3.fill_between(timestamps, cash, value, label='Crypto', alpha=0.7, color='orange')
         
         ax3.set_title('Asset Allocation')
         ax3.set_xlabel('Date')
@@ -130,8 +151,8 @@ def create_performance_dashboard(data):
     # Plot 4: Trade distribution by action
     ax4 = fig.add_subplot(gs[2, 0])
     
-    if data['trades'] is not None:
-        trade_counts = data['trades']['action'].value_counts()
+    if data['trade_counts'] is not None:
+        trade_counts = data['trade_counts']
         ax4.bar(trade_counts.index, trade_counts.values, color=['green', 'red'])
         ax4.set_title('Trade Distribution by Action')
         ax4.set_xlabel('Action')
@@ -143,11 +164,13 @@ def create_performance_dashboard(data):
     ax5 = fig.add_subplot(gs[2, 1])
     
     if data['portfolio'] is not None:
-        # Calculate daily returns
-        data['portfolio']['daily_return'] = data['portfolio']['value'].pct_change() * 100
-        data['portfolio'] = data['portfolio'].dropna()
+        # Calculate daily returns in one pass over the value array
+        value = data['portfolio']['value'].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily_return = np.diff(value) / value[:-1] * 100
+        daily_return = daily_return[np.isfinite(daily_return)]
         
-        sns.histplot(data['portfolio']['daily_return'], bins=20, kde=True, ax=ax5)
+        sns.histplot(daily_return, bins=20, kde=True, ax=ax5)
         ax5.set_title('Distribution of Daily Returns (%)')
         ax5.set_xlabel('Daily Return (%)')
         ax5.set_ylabel('Frequency')
@@ -155,6 +178,7 @@ def create_performance_dashboard(data):
     
     plt.tight_layout()
     plt.savefig('trading_dashboard.png', dpi=300, bbox_inches='tight')
+    plt.close(fig)  # Callers such as demo.py may draw it again in the same process
     print("Dashboard saved as trading_dashboard.png")
 
 if __name__ == "__main__":
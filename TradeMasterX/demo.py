@@ -7,9 +7,13 @@ import os
 import sys
 import time
 import argparse
+import threading
 import subprocess
 from datetime import datetime
 
+# The demos call into TradeMasterX in this process rather than starting
+# "python main.py" for each one, so the stack is only imported once
+
 def clear_screen():
     """Clear terminal screen based on OS."""
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -22,6 +26,33 @@ def print_header():
     print("=" * 80)
     print("\nThis script will demonstrate the key features of TradeMasterX\n")
 
+def prepare_environment():
+    """Create the working directories and migrate the database once, as main.py does per run."""
+    from main import ensure_directories
+    from migrate_database import migrate_database
+    
+    ensure_directories()
+    try:
+        migrate_database()
+    except Exception as e:
+        print(f"Error during database migration: {e}")
+
+def run_trading(config, seconds):
+    """Run a MasterBot with the given config on a background thread for `seconds`."""
+    from core.master_bot import MasterBot
+    
+    print(f"\n> Running MasterBot: {config}")
+    master_bot = MasterBot(config)
+    thread = threading.Thread(target=master_bot.run, name='MasterBot', daemon=True)
+    thread.start()
+    try:
+        thread.join(seconds)
+    finally:
+        # Ends the loop after its current cycle instead of killing a process
+        master_bot.stop()
+        thread.join()
+        master_bot.close()
+
 def run_command(command, wait_time=3):
     """Run a command and wait for specified time."""
     print(f"\n> Running: {command}")
@@ -48,8 +79,7 @@ def demo_trading_system():
     """Demonstrate the basic trading system."""
     print("\n\n=== BASIC TRADING SYSTEM DEMO ===")
     print("Running TradeMasterX for 15 seconds with simulated data...")
-    process = run_command("python main.py", wait_time=15)
-    kill_process(process)
+    run_trading({}, seconds=15)
     input("\nPress Enter to continue...")
 
 def demo_real_data():
@@ -57,22 +87,23 @@ def demo_real_data():
     print("\n\n=== REAL-TIME DATA DEMO ===")
     print("Running TradeMasterX with real-time market data for 15 seconds...")
     print("(Note: This requires internet connection)")
-    process = run_command("python main.py --real-data --coins bitcoin,ethereum", wait_time=15)
-    kill_process(process)
+    run_trading({'use_real_data': True, 'coins': ['bitcoin', 'ethereum']}, seconds=15)
     input("\nPress Enter to continue...")
 
 def demo_visualization():
     """Demonstrate trade visualization."""
     print("\n\n=== TRADE VISUALIZATION DEMO ===")
     print("Generating trade visualization...")
-    run_command("python main.py --visualize", wait_time=5)
+    import visualize_trades
+    visualize_trades.visualize_trades()
     input("\nPress Enter to continue...")
 
 def demo_dashboard():
     """Demonstrate performance dashboard."""
     print("\n\n=== PERFORMANCE DASHBOARD DEMO ===")
     print("Generating performance dashboard...")
-    run_command("python main.py --dashboard", wait_time=5)
+    import dashboard
+    dashboard.create_performance_dashboard(dashboard.load_data())
     input("\nPress Enter to continue...")
 
 def demo_web_interface():
@@ -81,6 +112,7 @@ def demo_web_interface():
     print("Starting web interface. Open http://localhost:5000 in your browser.")
     print("Press Ctrl+C when finished viewing...")
     
+    # The Flask server stays a separate process so it can be shut down on demand
     try:
         process = run_command("python main.py --web-interface", wait_time=1)
         print("\nWeb interface started! Press Enter when you've finished exploring...")
@@ -95,15 +127,15 @@ def demo_multiple_coins():
     """Demonstrate trading with multiple coins."""
     print("\n\n=== MULTI-CRYPTOCURRENCY TRADING DEMO ===")
     print("Running TradeMasterX with multiple cryptocurrencies...")
-    process = run_command("python main.py --coins bitcoin,ethereum,litecoin,ripple,dogecoin", wait_time=15)
-    kill_process(process)
+    run_trading({'coins': ['bitcoin', 'ethereum', 'litecoin', 'ripple', 'dogecoin']}, seconds=15)
     input("\nPress Enter to continue...")
 
 def demo_train_model():
     """Demonstrate model training."""
     print("\n\n=== PREDICTION MODEL TRAINING DEMO ===")
     print("Training the prediction model...")
-    run_command("python main.py --train", wait_time=10)
+    import train_prediction_model
+    train_prediction_model.train_and_evaluate()
     input("\nPress Enter to continue...")
 
 def main():
@@ -124,6 +156,8 @@ def main():
     print_header()
     
     try:
+        prepare_environment()
+        
         if all_demos or args.trading:
             demo_trading_system()
         
@@ -5,17 +5,51 @@ Advanced error handling and logging for the TradeMasterX system.
 """
 import os
 import logging
+from logging.handlers import MemoryHandler, RotatingFileHandler
 import traceback
 import sys
-import smtplib
 import json
+import string
 from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
+from notification_system import SMTPConnection
+
+class _SecondFormatter(logging.Formatter):
+    """Formatter with whole-second timestamps that reuses the last formatted second."""
+    
+    default_msec_format = None
+    
+    def __init__(self, fmt):
+        super().__init__(fmt, datefmt='%Y-%m-%d %H:%M:%S')
+        self._last_time = (None, '')  # (whole second, formatted asctime)
+    
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, asctime = self._last_time
+        if second != cached_second:
+            asctime = super().formatTime(record, self.datefmt)
+            self._last_time = (second, asctime)
+        return asctime
+
+# Shared by every handler attached to the error logger
+_FORMATTER = _SecondFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 class ErrorHandler:
     """Advanced error handling with logging, notifications, and recovery."""
     
+    # Body of the error alert email, filled in by send_notification
+    EMAIL_TEMPLATE = string.Template("""
+            <html>
+            <body>
+                <h2>TradeMasterX Error Alert</h2>
+                <p><strong>Time:</strong> $time</p>
+                <p><strong>Error:</strong> $error</p>
+                <h3>Stack Trace:</h3>
+                <pre>$stack_trace</pre>
+            </body>
+            </html>
+            """)
+    
     ERROR_LEVELS = {
         'INFO': logging.INFO,
         'WARNING': logging.WARNING,
@@ -29,6 +63,7 @@ class ErrorHandler:
         self.email_config = None
         self.notification_enabled = False
         self.recover_funcs = {}
+        self._smtp = None  # SMTPConnection, created on the first notification
         
         # Set up logging
         self.setup_logging()
@@ -47,18 +82,25 @@ class ErrorHandler:
         self.logger = logging.getLogger('TradeMasterXError')
         self.logger.setLevel(logging.INFO)
         
-        # Create file handler
-        file_handler = logging.FileHandler(os.path.join('logs', 'errors.log'))
+        # The logger is shared by name; another ErrorHandler has already set it
+        # up, and adding handlers again would write every message twice
+        if self.logger.handlers:
+            return
+        
+        # Create file handler: a size-capped rotating file (opened on the first record)
+        # behind a buffer that only writes out on ERROR or every 512 records.
+        # logging.shutdown() flushes whatever is still buffered at exit
+        rotating_handler = RotatingFileHandler(os.path.join('logs', 'errors.log'),
+                                               maxBytes=10_000_000, backupCount=5, delay=True)
+        rotating_handler.setFormatter(_FORMATTER)
+        file_handler = MemoryHandler(capacity=512, flushLevel=logging.ERROR, target=rotating_handler)
         file_handler.setLevel(logging.INFO)
         
         # Create console handler
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.ERROR)
         
-        # Create formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
+        console_handler.setFormatter(_FORMATTER)
         
         # Add handlers to logger
         self.logger.addHandler(file_handler)
@@ -73,6 +115,7 @@ class ErrorHandler:
             # Email notification settings
             if 'email' in config:
                 self.email_config = config['email']
+                self._smtp = None  # Reconnect with the new settings
                 self.notification_enabled = self.email_config.get('enabled', False)
                 
             # Set log level from config
@@ -110,26 +153,31 @@ class ErrorHandler:
         else:
             error_msg = str(error)
             
-        # Get stack trace
-        stack_trace = traceback.format_exc()
+        # The active exception, if any; its traceback is only formatted where it's used
+        exc_info = sys.exc_info()
+        has_trace = exc_info[0] is not None
         
-        # Log the error
+        # Log the error (logging formats the trace only if the level is enabled)
         self.logger.log(level, error_msg)
-        if stack_trace and stack_trace != "NoneType: None\n":
-            self.logger.log(level, f"Stack trace:\n{stack_trace}")
+        if has_trace:
+            self.logger.log(level, "Stack trace:", exc_info=exc_info)
             
         # Send notification for serious errors
         if level >= logging.ERROR and self.notification_enabled:
+            stack_trace = ''.join(traceback.format_exception(*exc_info)) if has_trace else ''
             self.send_notification(error_msg, stack_trace)
             
-        # Attempt recovery if registered
-        for error_type, recovery_func in self.recover_funcs.items():
-            if isinstance(error, error_type):
+        # Attempt recovery if registered, using the most specific registered
+        # class in the error's MRO (one dict lookup per base class)
+        for error_type in type(error).__mro__:
+            recovery_func = self.recover_funcs.get(error_type)
+            if recovery_func is not None:
                 try:
                     self.logger.info(f"Attempting recovery for {error_type.__name__}")
                     return recovery_func(error)
                 except Exception as recovery_error:
                     self.logger.error(f"Recovery failed: {recovery_error}")
+                break
                     
         return False  # No recovery attempted or recovery failed
     
@@ -150,32 +198,20 @@ class ErrorHandler:
                 return
                 
             # Create message
-            msg = MIMEMultipart()
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            msg = EmailMessage()
             msg['From'] = sender
             msg['To'] = recipient
-            msg['Subject'] = f"TradeMasterX Error Alert - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            msg['Subject'] = f"TradeMasterX Error Alert - {now}"
             
             # Build email body
-            body = f"""
-            <html>
-            <body>
-                <h2>TradeMasterX Error Alert</h2>
-                <p><strong>Time:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-                <p><strong>Error:</strong> {error_msg}</p>
-                <h3>Stack Trace:</h3>
-                <pre>{stack_trace}</pre>
-            </body>
-            </html>
-            """
+            body = self.EMAIL_TEMPLATE.substitute(time=now, error=error_msg, stack_trace=stack_trace)
+            msg.set_content(body, subtype='html')
             
-            msg.attach(MIMEText(body, 'html'))
-            
-            # Connect to server and send
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-            server.login(sender, password)
-            server.send_message(msg)
-            server.quit()
+            # Send over the kept-open connection
+            if self._smtp is None:
+                self._smtp = SMTPConnection(smtp_server, smtp_port, sender, password)
+            self._smtp.send_message(msg)
             
             self.logger.info(f"Error notification email sent to {recipient}")
             
@@ -207,13 +243,21 @@ class ErrorHandler:
             return None
 
 
-# Default error handler instance for global use
-default_handler = ErrorHandler()
+# Default error handler instance for global use, created on first use so
+# importing this module doesn't set up logging
+_default_handler = None
+
+def get_default_handler():
+    """Get or create the global error handler instance."""
+    global _default_handler
+    if _default_handler is None:
+        _default_handler = ErrorHandler()
+    return _default_handler
 
 def handle_error(error, context=None, level=None):
     """Global error handling function using default handler."""
-    return default_handler.handle_error(error, context, level)
+    return get_default_handler().handle_error(error, context, level)
 
 def safe_execute(func, *args, context=None, **kwargs):
     """Global safe execution function using default handler."""
-    return ErrorHandler.safe_execute(func, *args, error_handler=default_handler, context=context, **kwargs)
+    return ErrorHandler.safe_execute(func, *args, error_handler=get_default_handler(), context=context, **kwargs)
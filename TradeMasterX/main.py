@@ -7,31 +7,40 @@ import os
 import sys
 import argparse
 import logging
-from core.master_bot import MasterBot
-from ai_assistant import TradingAssistant
+
+# MasterBot and TradingAssistant are imported in the branches that use them,
+# so --dashboard, --visualize and --train don't load the whole trading stack
 
 def ensure_directories():
     """Ensure required directories exist."""
+    # Each mkdir/open is attempted directly and FileExistsError means it's already
+    # there, which saves a separate exists() check per path
     directories = ['logs', 'commands', 'data', 'web']
     for directory in directories:
-        if not os.path.exists(directory):
+        try:
+            os.mkdir(directory)
             print(f"Creating directory: {directory}")
-            os.makedirs(directory)
+        except FileExistsError:
+            pass
     
     # Create data directory for each supported coin
     # Default coins to create directories for
     default_coins = ['bitcoin', 'ethereum', 'litecoin', 'dogecoin', 'cardano']
     for coin in default_coins:
         coin_dir = os.path.join('data', coin)
-        if not os.path.exists(coin_dir):
+        try:
+            os.mkdir(coin_dir)
             print(f"Creating coin directory: {coin_dir}")
-            os.makedirs(coin_dir)
+        except FileExistsError:
+            pass
             
-    # Ensure control.txt exists
+    # Ensure control.txt exists ('x' mode only creates a new file)
     control_path = os.path.join('commands', 'control.txt')
-    if not os.path.exists(control_path):
-        with open(control_path, 'w') as f:
+    try:
+        with open(control_path, 'x') as f:
             f.write('RUN\n')
+    except FileExistsError:
+        pass
             
 def parse_arguments():
     """Parse command-line arguments."""
@@ -92,6 +101,7 @@ def main():
             
         if args.assistant:
             print("Starting TradeMasterX Assistant...")
+            from ai_assistant import TradingAssistant
             assistant = TradingAssistant()
             assistant.run_cli()
             return 0
@@ -109,6 +119,7 @@ def main():
         # Default: run the trading system
         print("Starting TradeMasterX Trading System...")
         print("Initializing MasterBot...")
+        from core.master_bot import MasterBot
         
         # Convert string arguments to appropriate types
         config = {
@@ -18,6 +18,15 @@ def migrate_database():
     
     try:
         conn = sqlite3.connect(db_path)
+        
+        # Same settings as TradeExecutor; WAL mode is stored in the database file,
+        # so trading starts on a WAL database even when no migration is needed
+        conn.executescript('''
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        ''')
         cursor = conn.cursor()
         
         # Check if migration is needed
@@ -32,10 +41,15 @@ def migrate_database():
         
         print("Starting database migration...")
         
+        # Run every change below in one explicit transaction (SQLite DDL is
+        # transactional), so a failure part-way leaves the old schema intact
+        conn.isolation_level = None
+        cursor.execute('BEGIN')
+        
         # Create new tables
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS coin_holdings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             portfolio_id INTEGER,
             coin TEXT,
             amount REAL,
@@ -57,13 +71,13 @@ def migrate_database():
             cursor.execute("SELECT id, crypto FROM portfolio")
             portfolio_entries = cursor.fetchall()
             
-            # Migrate data - add 'bitcoin' as the default for old 'crypto' values
-            for portfolio_id, crypto_amount in portfolio_entries:
-                if crypto_amount is not None and crypto_amount > 0:
-                    cursor.execute(
-                        "INSERT INTO coin_holdings (portfolio_id, coin, amount) VALUES (?, ?, ?)",
-                        (portfolio_id, 'bitcoin', crypto_amount)
-                    )
+            # Migrate data - add 'bitcoin' as the default for old 'crypto' values,
+            # inserted in one batch within the migration transaction
+            cursor.executemany(
+                "INSERT INTO coin_holdings (portfolio_id, coin, amount) VALUES (?, ?, ?)",
+                [(portfolio_id, 'bitcoin', crypto_amount) for portfolio_id, crypto_amount in portfolio_entries
+                 if crypto_amount is not None and crypto_amount > 0]
+            )
             
             # Alter portfolio table: remove crypto column - SQLite doesn't support DROP COLUMN
             # So we need to recreate the table without that column
@@ -99,7 +113,7 @@ def migrate_database():
                 # Create a new trades table with updated schema
                 cursor.execute('''
                 CREATE TABLE trades_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id INTEGER PRIMARY KEY,
                     timestamp TEXT,
                     coin TEXT,
                     action TEXT,
@@ -126,13 +140,31 @@ def migrate_database():
         except Exception as e:
             print(f"Error updating trades table: {str(e)}")
         
-        conn.commit()
+        # Index the columns the trading system looks rows up by. The ids are plain
+        # INTEGER PRIMARY KEYs (no AUTOINCREMENT), so inserts skip sqlite_sequence
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_holdings_pid_coin ON coin_holdings (portfolio_id, coin)')
+        for index_sql, note in (
+            ('CREATE INDEX IF NOT EXISTS idx_portfolio_ts ON portfolio (timestamp)', 'No portfolio table'),
+            ('CREATE INDEX IF NOT EXISTS idx_trades_ts_coin ON trades (timestamp, coin)',
+             'No trades table, or one from a schema without a coin column'),
+        ):
+            try:
+                cursor.execute(index_sql)
+            except sqlite3.OperationalError:
+                print(f"Skipped index: {note}")
+        
+        cursor.execute('COMMIT')
+        
+        # Reclaim the pages freed by the table rebuilds
+        cursor.execute('VACUUM')
         
         print("Database migration completed successfully!")
         return True
         
     except Exception as e:
         print(f"Migration error: {str(e)}")
+        if 'conn' in locals() and conn.in_transaction:
+            conn.rollback()
         return False
     finally:
         if 'conn' in locals():
@@ -3,22 +3,121 @@ notification_system.py
 A module for sending notifications about important trading events.
 """
 import os
+import sys
 import datetime
 import json
+import time
+import queue
+import atexit
+import threading
+from collections import OrderedDict
+import asyncio
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+# Async SMTP client for sending emails off the notify() path if available
+try:
+    import aiosmtplib
+except ImportError:
+    aiosmtplib = None
+
+# Standard notification levels, each given a precompiled notify handler
+LEVELS = ('INFO', 'TRADE', 'WARNING', 'ERROR')
+
+# Levels that also send an email (when email is enabled)
+EMAIL_LEVELS = ('TRADE', 'WARNING', 'ERROR')
+
+class SMTPConnection:
+    """One logged-in SMTP session reused across sends.
+    
+    Reconnects if the server has dropped the session and quits after
+    idle_timeout seconds without a send.
+    """
+    
+    def __init__(self, host, port, username, password, idle_timeout=60):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self._smtp = None
+        self._lock = threading.Lock()
+        self._idle_timer = None
+        atexit.register(self.close)
+    
+    def _connect(self):
+        """Open, secure and log in a new SMTP session."""
+        smtp = smtplib.SMTP(self.host, self.port, timeout=30)
+        smtp.starttls()
+        smtp.login(self.username, self.password)
+        return smtp
+    
+    def send_message(self, msg):
+        """Send msg over the open session, reconnecting once if the server hung up."""
+        with self._lock:
+            for attempt in range(2):
+                if self._smtp is None:
+                    self._smtp = self._connect()
+                try:
+                    self._smtp.send_message(msg)
+                    break
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self._smtp = None
+                    if attempt:
+                        raise
+            
+            # Restart the idle countdown
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+            self._idle_timer = threading.Timer(self.idle_timeout, self.close)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+    
+    def close(self):
+        """Quit the session if one is open."""
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except Exception:
+                    pass
+                self._smtp = None
+
 class NotificationSystem:
     def __init__(self, config_file=None):
         """Initialize the notification system with configuration."""
         self.config_file = config_file or os.path.join('config', 'notifications.json')
         self.config = self._load_config()
+        self._compile_filters()
         self.notification_log = os.path.join('logs', 'notifications.log')
         
         # Ensure log directory exists
         if not os.path.exists('logs'):
             os.makedirs('logs')
+        
+        # Log entries are queued and written by a background thread, which
+        # flushes once per batch of up to log_batch_size entries or
+        # log_flush_interval seconds instead of reopening the file per entry
+        self.log_batch_size = 128
+        self.log_flush_interval = 0.2
+        self._log_queue = queue.Queue()
+        self._log_thread = threading.Thread(target=self._drain_log_queue, name='NotificationLog', daemon=True)
+        self._log_thread.start()
+        atexit.register(self._flush_and_close)
+        
+        # (level, message) -> monotonic time it was last sent, oldest first
+        self._recent = OrderedDict()
+        self._recent_max = 512
+        self._recent_lock = threading.Lock()
+        
+        self._smtp = None  # SMTPConnection, created on the first email (without aiosmtplib)
+        
+        # Emails are sent from an asyncio loop on its own thread, started on the first email
+        self._email_loop = None
+        self._email_loop_lock = threading.Lock()
+        self._aio_smtp = None  # aiosmtplib.SMTP client, reused across emails
+        self._aio_smtp_lock = None  # asyncio.Lock serializing use of _aio_smtp
     
     def _load_config(self):
         """Load notification configuration from JSON file."""
@@ -61,16 +160,81 @@ class NotificationSystem:
         except Exception:
             return default_config
     
+    def _compile_filters(self):
+        """Precompute the throttle window and per-level notify handlers; rerun after changing config."""
+        self._throttle_sec = self.config.get("throttle_minutes", 5) * 60
+        self._dispatch = {level: self._compile_level(level) for level in LEVELS}
+    
+    def _compile_level(self, level):
+        """Build the notify handler for one level, with its config checks already decided."""
+        if not self.config.get("enabled", True) or not self.config.get("notification_levels", {}).get(level, True):
+            return lambda message, force: False
+        
+        console_output = bool(self.config.get("console_output", True))
+        log_file = bool(self.config.get("log_file", True))
+        send_email = level in EMAIL_LEVELS and bool(self.config.get("email", {}).get("enabled", False))
+        
+        def handler(message, force):
+            # Check throttling
+            if not force and self._should_throttle(level, message):
+                return False
+            
+            if console_output:
+                self._print_notification(level, message)
+            if log_file:
+                self._log_notification(level, message)
+            self._remember(level, message)
+            
+            if send_email:
+                self._send_email(f"{level}: {message[:30]}...", message)
+            
+            return True
+        
+        return handler
+    
     def _log_notification(self, level, message):
         """Log notification to file."""
-        if not self.config.get("log_file", True):
-            return
-            
         timestamp = datetime.datetime.now().isoformat()
-        log_entry = f"{timestamp} [{level}] {message}\n"
-        
-        with open(self.notification_log, 'a') as f:
-            f.write(log_entry)
+        self._log_queue.put_nowait(f"{timestamp} [{level}] {message}\n")
+    
+    def _print_notification(self, level, message):
+        """Write a notification's console line with a single write call."""
+        # print() writes the text and the newline separately, so lines from
+        # concurrent bot threads could interleave; one write keeps each line whole
+        sys.stdout.write(f"[{level}] {message}\n")
+    
+    def _drain_log_queue(self):
+        """Log thread: write queued entries in batches until _flush_and_close sends None."""
+        with open(self.notification_log, 'a', buffering=65536) as f:
+            while True:
+                # Block for the first entry, then collect more for up to log_flush_interval
+                batch = [self._log_queue.get()]
+                deadline = time.monotonic() + self.log_flush_interval
+                while batch[-1] is not None and len(batch) < self.log_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._log_queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                
+                stop = batch[-1] is None
+                try:
+                    f.writelines(entry for entry in batch if entry is not None)
+                    f.flush()
+                except Exception as e:
+                    print(f"Notification log error: {str(e)}")
+                for _ in batch:
+                    self._log_queue.task_done()
+                if stop:
+                    return
+    
+    def _flush_and_close(self):
+        """Write out any queued log entries and stop the log thread."""
+        if self._log_thread.is_alive():
+            self._log_queue.put(None)
+            self._log_thread.join()
     
     def _send_email(self, subject, message):
         """Send email notification."""
@@ -87,55 +251,81 @@ class NotificationSystem:
             
             msg.attach(MIMEText(message, 'plain'))
             
-            server = smtplib.SMTP(email_config.get("smtp_server"), email_config.get("smtp_port", 587))
-            server.starttls()
-            server.login(email_config.get("username"), email_config.get("password"))
-            server.send_message(msg)
-            server.quit()
+            # Hand the message to the email loop; notify() doesn't wait for SMTP
+            asyncio.run_coroutine_threadsafe(self._async_send(msg, email_config), self._get_email_loop())
             
             return True
         except Exception as e:
             print(f"Email notification error: {str(e)}")
             return False
     
-    def _should_throttle(self, level, message):
-        """Check if similar notifications have been sent recently."""
-        throttle_minutes = self.config.get("throttle_minutes", 5)
-        
-        if throttle_minutes <= 0:
-            return False
+    def _get_email_loop(self):
+        """Return the email event loop, starting its thread on first use."""
+        with self._email_loop_lock:
+            if self._email_loop is None:
+                self._email_loop = asyncio.new_event_loop()
+                threading.Thread(target=self._email_loop.run_forever, name='NotificationEmail', daemon=True).start()
+            return self._email_loop
+    
+    async def _async_send(self, msg, email_config):
+        """Send one email on the email loop, reusing the open SMTP session."""
+        try:
+            if aiosmtplib is None:
+                # Fall back to the blocking client on a worker thread
+                if self._smtp is None:
+                    self._smtp = SMTPConnection(email_config.get("smtp_server"), email_config.get("smtp_port", 587),
+                                                email_config.get("username"), email_config.get("password"))
+                await asyncio.to_thread(self._smtp.send_message, msg)
+                return
             
-        # Check notification log for similar messages
-        if not os.path.exists(self.notification_log):
-            return False
+            if self._aio_smtp_lock is None:
+                self._aio_smtp_lock = asyncio.Lock()  # Created here so it belongs to the email loop
             
-        try:
-            with open(self.notification_log, 'r') as f:
-                lines = f.readlines()
-                
-            # Check last 50 log entries
-            for line in reversed(lines[-50:]):
-                try:
-                    parts = line.strip().split(' ', 2)
-                    if len(parts) >= 3:
-                        timestamp_str = parts[0]
-                        log_level = parts[1].strip('[]')
-                        log_message = parts[2]
-                        
-                        # If we find a similar message with the same level
-                        if level == log_level and message in log_message:
-                            timestamp = datetime.datetime.fromisoformat(timestamp_str)
-                            now = datetime.datetime.now()
-                            
-                            # If the message is within throttle window
-                            if (now - timestamp).total_seconds() < throttle_minutes * 60:
-                                return True
-                except Exception:
-                    continue
-                    
-            return False
-        except Exception:
+            async with self._aio_smtp_lock:
+                for attempt in range(2):
+                    if self._aio_smtp is None or not self._aio_smtp.is_connected:
+                        client = aiosmtplib.SMTP(hostname=email_config.get("smtp_server"),
+                                                 port=email_config.get("smtp_port", 587), start_tls=True)
+                        await client.connect()
+                        await client.login(email_config.get("username"), email_config.get("password"))
+                        self._aio_smtp = client
+                    try:
+                        await self._aio_smtp.send_message(msg)
+                        break
+                    except aiosmtplib.SMTPServerDisconnected:
+                        # The server closed the idle session; reconnect once
+                        self._aio_smtp = None
+                        if attempt:
+                            raise
+        except Exception as e:
+            print(f"Email notification error: {str(e)}")
+    
+    def _should_throttle(self, level, message):
+        """Check if the same notification was sent within the last throttle_minutes."""
+        if self._throttle_sec <= 0:
             return False
+        
+        with self._recent_lock:
+            sent_at = self._recent.get((level, message))
+            return sent_at is not None and time.monotonic() - sent_at < self._throttle_sec
+    
+    def _remember(self, level, message):
+        """Record that a notification was just sent, dropping entries past the throttle window."""
+        window = self._throttle_sec
+        if window <= 0:
+            return  # Throttling is off, so there is nothing to remember
+        
+        now = time.monotonic()
+        key = (level, message)
+        
+        with self._recent_lock:
+            self._recent[key] = now
+            self._recent.move_to_end(key)
+            
+            # Entries are in send order, so expired and excess ones are at the front
+            while self._recent and (len(self._recent) > self._recent_max
+                                    or now - next(iter(self._recent.values())) >= window):
+                self._recent.popitem(last=False)
     
     def notify(self, level, message, force=False):
         """
@@ -146,30 +336,11 @@ class NotificationSystem:
             message: Notification message
             force: If True, bypass throttling checks
         """
-        if not self.config.get("enabled", True):
-            return False
-            
-        # Check if this level of notification is enabled
-        notification_levels = self.config.get("notification_levels", {})
-        if not notification_levels.get(level, True):
-            return False
-            
-        # Check throttling
-        if not force and self._should_throttle(level, message):
-            return False
-        
-        # Console output
-        if self.config.get("console_output", True):
-            print(f"[{level}] {message}")
-        
-        # Log to file
-        self._log_notification(level, message)
-        
-        # Send email for TRADE, WARNING, and ERROR levels
-        if level in ['TRADE', 'WARNING', 'ERROR']:
-            self._send_email(f"{level}: {message[:30]}...", message)
-        
-        return True
+        handler = self._dispatch.get(level)
+        if handler is None:
+            # Non-standard levels are compiled against the current config on each call
+            handler = self._compile_level(level)
+        return handler(message, force)
 
 # Global notification instance for easy access
 _notification_system = None
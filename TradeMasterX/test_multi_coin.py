@@ -5,6 +5,8 @@ the 'crypto' KeyError bug has been fixed.
 """
 import sys
 import os
+import argparse
+import logging
 
 # Add parent directory to path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,9 +15,20 @@ from core.trade_executor import TradeExecutor
 from core.coin_selector import CoinSelector
 import time
 
-def test_trade_execution():
-    """Test trade execution with multiple coins."""
-    print("Starting multi-cryptocurrency trade test...")
+# Test progress goes to multi_coin_test_log.txt (handler added in __main__)
+logger = logging.getLogger('multi_coin')
+
+def test_trade_execution(soak=False):
+    """Test trade execution with multiple coins.
+    
+    Args:
+        soak (bool): If True, pause between trades and selections like a live run
+    """
+    logger.info("Starting multi-cryptocurrency trade test...")
+    
+    # Trades run back to back unless pacing was requested
+    trade_pause = 1 if soak else 0
+    select_pause = 0.2 if soak else 0
     
     # Test coins
     coins = ['bitcoin', 'ethereum', 'litecoin', 'cardano', 'dogecoin']
@@ -26,70 +39,76 @@ def test_trade_execution():
     # Initialize coin selector
     coin_selector = CoinSelector(coins=coins)
     
-    print(f"Initial portfolio: {trade_executor.portfolio}")
+    logger.info(f"Initial portfolio: {trade_executor.portfolio}")
     
     # Execute BUY trades for each coin
     for coin in coins:
-        print(f"\nTesting BUY trade for {coin}...")
+        logger.info(f"\nTesting BUY trade for {coin}...")
         try:
             result = trade_executor.execute_trade('BUY', coin)
-            print(f"Trade result: {result}")
-            print(f"Updated portfolio: {trade_executor.portfolio}")
-            time.sleep(1)  # Wait a bit between trades
+            logger.info(f"Trade result: {result}")
+            logger.info(f"Updated portfolio: {trade_executor.portfolio}")
+            if trade_pause:
+                time.sleep(trade_pause)  # Wait a bit between trades
         except KeyError as e:
-            print(f"ERROR: KeyError occurred when trading {coin}: {str(e)}")
+            logger.error(f"ERROR: KeyError occurred when trading {coin}: {str(e)}")
             return False
         except Exception as e:
-            print(f"ERROR: An unexpected error occurred: {str(e)}")
+            logger.error(f"ERROR: An unexpected error occurred: {str(e)}")
             return False
     
     # Execute SELL trades for each coin
     for coin in coins:
-        print(f"\nTesting SELL trade for {coin}...")
+        logger.info(f"\nTesting SELL trade for {coin}...")
         try:
             result = trade_executor.execute_trade('SELL', coin)
-            print(f"Trade result: {result}")
-            print(f"Updated portfolio: {trade_executor.portfolio}")
-            time.sleep(1)  # Wait a bit between trades
+            logger.info(f"Trade result: {result}")
+            logger.info(f"Updated portfolio: {trade_executor.portfolio}")
+            if trade_pause:
+                time.sleep(trade_pause)  # Wait a bit between trades
         except KeyError as e:
-            print(f"ERROR: KeyError occurred when trading {coin}: {str(e)}")
+            logger.error(f"ERROR: KeyError occurred when trading {coin}: {str(e)}")
             return False
         except Exception as e:
-            print(f"ERROR: An unexpected error occurred: {str(e)}")
+            logger.error(f"ERROR: An unexpected error occurred: {str(e)}")
             return False
     
     # Test coin selector
-    print("\nTesting coin selector...")
+    logger.info("\nTesting coin selector...")
     for i in range(10):
         selected_coin = coin_selector.select_coin()
-        print(f"Round {i+1}: Selected {selected_coin}")
-        time.sleep(0.2)
+        logger.info(f"Round {i+1}: Selected {selected_coin}")
+        if select_pause:
+            time.sleep(select_pause)
     
-    print("\nAll tests passed successfully!")
+    logger.info("\nAll tests passed successfully!")
     return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Validate multi-cryptocurrency trade execution')
+    parser.add_argument('--soak', action='store_true', help='Pause between trades and coin selections')
+    args = parser.parse_args()
+    
     # Ensure the necessary directories exist
     if not os.path.exists('logs'):
         os.makedirs('logs')
     if not os.path.exists('data'):
         os.makedirs('data')
     
-    # Open a log file to capture output
-    with open('multi_coin_test_log.txt', 'w') as log_file:
-        # Redirect stdout to the log file
-        original_stdout = sys.stdout
-        sys.stdout = log_file
+    # Write the test's output to a log file, leaving stdout alone
+    log_handler = logging.FileHandler('multi_coin_test_log.txt', mode='w')
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False  # Keep it out of any handlers the trading modules configure
+    
+    try:
+        # Run the test
+        success = test_trade_execution(soak=args.soak)
         
-        try:
-            # Run the test
-            success = test_trade_execution()
-            
-            # Write final status
-            print(f"\nTEST {'PASSED' if success else 'FAILED'}")
-        finally:
-            # Restore stdout
-            sys.stdout = original_stdout
+        # Write final status
+        logger.info(f"\nTEST {'PASSED' if success else 'FAILED'}")
+    finally:
+        log_handler.close()
     
     # Print a short summary to console
     print("Test completed. See multi_coin_test_log.txt for details.")
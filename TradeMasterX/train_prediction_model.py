@@ -7,12 +7,21 @@ import pandas as pd
 import numpy as np
 import pickle
 import datetime
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+import joblib
+from joblib import Parallel, delayed
+from scipy.stats import loguniform, randint
+from sklearn.model_selection import train_test_split, RandomizedSearchCV
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.metrics import classification_report, confusion_matrix
 import matplotlib.pyplot as plt
-import seaborn as sns
+from bots.prediction_bot import FEATURES
+
+# Compiled RSI kernel if Numba is available; otherwise RSI is built from pandas rolling means
+try:
+    from bots._features_numba import rsi as compute_rsi
+except ImportError:
+    compute_rsi = None
 
 # Import notification system if available
 try:
@@ -22,6 +31,10 @@ except ImportError:
     def notify(level, message, force=False):
         print(f"[{level}] {message}")
 
+# Part of the feature cache key; bump whenever create_features or create_target
+# change their output so frames cached by older code are rebuilt
+FEATURE_CACHE_VERSION = 4
+
 def load_price_history():
     """Load price history from CSV file."""
     price_file = os.path.join('data', 'price_history.csv')
@@ -31,13 +44,9 @@ def load_price_history():
         return None
     
     try:
-        # Read CSV into pandas DataFrame
-        df = pd.read_csv(price_file)
-        
-        # Convert timestamp strings to datetime objects
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        return df
+        # Timestamps parsed while reading; prices stored as float32 to halve the
+        # frame (create_features widens them to float64 once)
+        return pd.read_csv(price_file, parse_dates=['timestamp'], dtype={'price': 'float32'}, engine='c')
     except Exception as e:
         print(f"Error loading price history: {str(e)}")
         return None
@@ -51,90 +60,175 @@ def load_trade_history():
         return None
     
     try:
-        # Read CSV into pandas DataFrame
-        df = pd.read_csv(trade_file)
-        
-        # Convert timestamp strings to datetime objects
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        return df
+        # Timestamps parsed while reading, float32 prices as in load_price_history
+        return pd.read_csv(trade_file, parse_dates=['timestamp'], dtype={'price': 'float32'}, engine='c')
     except Exception as e:
         print(f"Error loading trade history: {str(e)}")
         return None
 
+# Histories at least this long compute their rolling/EWM indicators on a thread pool
+# (pandas' window kernels release the GIL); shorter ones aren't worth the dispatch
+PARALLEL_FEATURE_ROWS = 100000
+
+# Independent window aggregations create_features needs, as (kind, window or span)
+WINDOW_FEATURES = (
+    ('mean', 5), ('mean', 10), ('mean', 15), ('mean', 20),
+    ('std', 5), ('std', 10),
+    ('ewm', 12), ('ewm', 26)
+)
+
+def _window_feature(price, kind, window):
+    """Return price.rolling(window).mean()/.std() or price.ewm(span=window).mean() as an array."""
+    if kind == 'ewm':
+        return price.ewm(span=window).mean().to_numpy()
+    return getattr(price.rolling(window=window), kind)().to_numpy()
+
+def _lag_returns(price, periods):
+    """Return price / price k steps earlier - 1 (like pct_change(k)) for each k in periods.
+    
+    The lagged prices are stacked into one (len(price), len(periods)) array so all
+    the ratios come from a single divide; entries with no earlier price are NaN.
+    """
+    longest = max(periods)
+    padded = np.concatenate((np.full(longest, np.nan), price))
+    n = price.shape[0]
+    lagged = np.stack([padded[longest - k:longest - k + n] for k in periods], axis=1)
+    return price[:, np.newaxis] / lagged - 1
+
 def create_features(df):
     """Create features for the prediction model."""
-    # Make a copy to avoid modifying the original
-    df = df.copy()
-    
-    # Price changes
-    df['price_change'] = df['price'].pct_change()
-    df['price_change_1d'] = df['price'].pct_change(periods=1)
-    df['price_change_2d'] = df['price'].pct_change(periods=2)
-    df['price_change_3d'] = df['price'].pct_change(periods=3)
-    df['price_change_5d'] = df['price'].pct_change(periods=5)
-    
-    # Moving averages
-    df['ma_5'] = df['price'].rolling(window=5).mean()
-    df['ma_10'] = df['price'].rolling(window=10).mean()
-    df['ma_15'] = df['price'].rolling(window=15).mean()
-    df['ma_20'] = df['price'].rolling(window=20).mean()
-    
-    # Moving average crossovers
-    df['ma_5_10_ratio'] = df['ma_5'] / df['ma_10']
-    df['ma_10_20_ratio'] = df['ma_10'] / df['ma_20']
-    
-    # Volatility
-    df['volatility_5'] = df['price'].rolling(window=5).std()
-    df['volatility_10'] = df['price'].rolling(window=10).std()
-    
-    # Rate of change
-    df['roc_5'] = (df['price'] / df['price'].shift(5) - 1) * 100
-    df['roc_10'] = (df['price'] / df['price'].shift(10) - 1) * 100
+    # Every feature is computed as a NumPy array from one copy of the prices, and
+    # the arrays are joined to a new frame in one step instead of column by column
+    price = df['price']
+    p = price.to_numpy(dtype=np.float64)
+    
+    # Price changes (price_change_1d is the same series as price_change)
+    price_change, price_change_2d, price_change_3d, price_change_5d, price_change_10d = _lag_returns(p, (1, 2, 3, 5, 10)).T
+    
+    # Moving averages, volatility and the MACD EMAs
+    if len(p) >= PARALLEL_FEATURE_ROWS:
+        windows = Parallel(n_jobs=-1, backend='threading')(
+            delayed(_window_feature)(price, kind, window) for kind, window in WINDOW_FEATURES
+        )
+    else:
+        windows = [_window_feature(price, kind, window) for kind, window in WINDOW_FEATURES]
+    ma_5, ma_10, ma_15, ma_20, volatility_5, volatility_10, ema_12, ema_26 = windows
     
     # Simple RSI (Relative Strength Index)
-    delta = df['price'].diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    
-    avg_gain = gain.rolling(window=14).mean()
-    avg_loss = loss.rolling(window=14).mean()
-    
-    # Avoid division by zero
-    avg_loss = avg_loss.replace(0, 0.001)
-    
-    rs = avg_gain / avg_loss
-    df['rsi'] = 100 - (100 / (1 + rs))
+    if compute_rsi is not None:
+        rsi = compute_rsi(p, 14)
+    else:
+        delta = np.diff(p, prepend=np.nan)
+        gain = pd.Series(np.clip(delta, 0, None))
+        loss = pd.Series(-np.clip(delta, None, 0))
+        
+        avg_gain = gain.rolling(window=14).mean().to_numpy()
+        avg_loss = loss.rolling(window=14).mean().to_numpy()
+        
+        # Avoid division by zero
+        avg_loss = np.where(avg_loss == 0, 0.001, avg_loss)
+        
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
     
     # MACD (Moving Average Convergence Divergence)
-    ema_12 = df['price'].ewm(span=12).mean()
-    ema_26 = df['price'].ewm(span=26).mean()
-    df['macd'] = ema_12 - ema_26
-    df['macd_signal'] = df['macd'].ewm(span=9).mean()
-    df['macd_hist'] = df['macd'] - df['macd_signal']
-    
-    # Price distance from moving averages (as percentage)
-    df['price_ma_5_delta'] = (df['price'] / df['ma_5'] - 1) * 100
-    df['price_ma_10_delta'] = (df['price'] / df['ma_10'] - 1) * 100
-    
-    return df
+    macd = ema_12 - ema_26
+    macd_signal = pd.Series(macd).ewm(span=9).mean().to_numpy()
+    
+    features = dict(
+        price_change=price_change,
+        price_change_1d=price_change,
+        price_change_2d=price_change_2d,
+        price_change_3d=price_change_3d,
+        price_change_5d=price_change_5d,
+        ma_5=ma_5,
+        ma_10=ma_10,
+        ma_15=ma_15,
+        ma_20=ma_20,
+        # Moving average crossovers
+        ma_5_10_ratio=ma_5 / ma_10,
+        ma_10_20_ratio=ma_10 / ma_20,
+        # Volatility
+        volatility_5=volatility_5,
+        volatility_10=volatility_10,
+        # Rate of change
+        roc_5=price_change_5d * 100,
+        roc_10=price_change_10d * 100,
+        rsi=rsi,
+        macd=macd,
+        macd_signal=macd_signal,
+        macd_hist=macd - macd_signal,
+        # Price distance from moving averages (as percentage)
+        price_ma_5_delta=(p / ma_5 - 1) * 100,
+        price_ma_10_delta=(p / ma_10 - 1) * 100
+    )
+    
+    # Indicators are computed in float64 and stored as float32, which halves the
+    # frame; the model bins each feature, so the dropped precision doesn't matter
+    features = pd.DataFrame(features, index=df.index, dtype=np.float32)
+    return pd.concat([df.drop(columns=list(features.columns), errors='ignore'), features], axis=1)
 
 def create_target(df, forecast_periods=1, threshold_pct=0.5):
     """Create target variable for price movement prediction."""
     # Calculate future price change
-    df['future_price_change'] = df['price'].shift(-forecast_periods) / df['price'] - 1
+    future_price_change = (df['price'].shift(-forecast_periods) / df['price'] - 1).to_numpy()
+    df['future_price_change'] = future_price_change
     
-    # Create categorical target based on threshold
-    df['target'] = 0  # Default to HOLD
-    df.loc[df['future_price_change'] > threshold_pct/100, 'target'] = 1  # BUY
-    df.loc[df['future_price_change'] < -threshold_pct/100, 'target'] = -1  # SELL
+    # Create categorical target based on threshold in one pass:
+    # BUY (1) above it, SELL (-1) below its negative, HOLD (0) otherwise
+    threshold = threshold_pct / 100
+    df['target'] = np.where(future_price_change > threshold, 1,
+                            np.where(future_price_change < -threshold, -1, 0)).astype(np.int8)
+    
+    return df
+
+def load_training_frame(forecast_periods=1, threshold_pct=0.5):
+    """Load the price history with features and target added.
+    
+    The result is cached in data/feature_cache.pkl and reused while the price
+    history file and target settings are unchanged, so repeated training runs
+    skip the CSV parse and feature engineering.
+    """
+    price_file = os.path.join('data', 'price_history.csv')
+    cache_file = os.path.join('data', 'feature_cache.pkl')
+    
+    try:
+        st = os.stat(price_file)
+        key = (FEATURE_CACHE_VERSION, st.st_mtime_ns, st.st_size, forecast_periods, threshold_pct)
+    except FileNotFoundError:
+        key = None  # load_price_history reports the missing file
+    
+    if key is not None and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            if cached['key'] == key:
+                return cached['frame']
+        except Exception as e:
+            print(f"Ignoring unreadable feature cache: {str(e)}")
+    
+    df = load_price_history()
+    if df is None:
+        return None
+    
+    # Create features and target
+    df = create_target(create_features(df), forecast_periods=forecast_periods, threshold_pct=threshold_pct)
+    
+    if key is not None:
+        try:
+            # Write to a temporary file and swap it in so a crash never leaves a partial cache
+            tmp_path = cache_file + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'key': key, 'frame': df}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_file)
+        except Exception as e:
+            print(f"Could not save feature cache: {str(e)}")
     
     return df
 
 def train_and_evaluate():
     """Train an ML model and evaluate its performance."""
-    # Load price history
-    df = load_price_history()
+    # Load price history with features and target (predict price movement 1 day in advance)
+    df = load_training_frame(forecast_periods=1, threshold_pct=0.5)
     if df is None:
         notify('ERROR', "Failed to load price history for training.")
         return False
@@ -146,26 +240,14 @@ def train_and_evaluate():
     
     print(f"Loaded {len(df)} price data points.")
     
-    # Create features
-    df = create_features(df)
-    
-    # Create target (predict price movement 1 day in advance)
-    df = create_target(df, forecast_periods=1, threshold_pct=0.5)
-    
     # Drop missing values
     df = df.dropna()
     
-    # Feature columns
-    feature_columns = [
-        'price_change', 'price_change_1d', 'price_change_2d', 'price_change_3d',
-        'price_change_5d', 'ma_5', 'ma_10', 'ma_15', 'ma_20', 'ma_5_10_ratio',
-        'ma_10_20_ratio', 'volatility_5', 'volatility_10', 'roc_5', 'roc_10',
-        'rsi', 'macd', 'macd_signal', 'macd_hist',
-        'price_ma_5_delta', 'price_ma_10_delta'
-    ]
+    # Feature columns, in the order PredictionBot builds its input vector
+    feature_columns = list(FEATURES)
     
     # Split into features and target
-    X = df[feature_columns].values
+    X = df[feature_columns].to_numpy(dtype=np.float32)
     y = df['target'].values
     
     # Handle class imbalance if needed
@@ -175,38 +257,38 @@ def train_and_evaluate():
     # Split into training and testing sets (80% train, 20% test)
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
     
-    # Scale features
-    scaler = StandardScaler()
-    X_train = scaler.fit_transform(X_train)
-    X_test = scaler.transform(X_test)
+    # No feature scaling: histogram boosting bins each feature, so it is scale-invariant
     
     # Train model with hyperparameter tuning
     print("Training model with hyperparameter tuning...")
     
-    # Define parameter grid for GridSearchCV
-    param_grid = {
-        'n_estimators': [50, 100, 200],
-        'max_depth': [3, 5, 7],
-        'learning_rate': [0.05, 0.1, 0.2]
+    # Parameter distributions for RandomizedSearchCV (20 samples instead of the full 27-point grid)
+    param_distributions = {
+        'max_iter': randint(50, 250),
+        'max_depth': randint(3, 8),
+        'learning_rate': loguniform(0.02, 0.3),
+        'max_leaf_nodes': randint(8, 32)
     }
     
-    # Create and train model
-    base_model = GradientBoostingClassifier(random_state=42)
-    grid_search = GridSearchCV(base_model, param_grid, cv=3, scoring='f1_weighted')
-    grid_search.fit(X_train, y_train)
+    # Create and train model, fitting the candidates in parallel across cores
+    base_model = HistGradientBoostingClassifier(random_state=42, early_stopping=True, validation_fraction=0.1)
+    search = RandomizedSearchCV(base_model, param_distributions=param_distributions, n_iter=20, cv=3,
+                                scoring='f1_weighted', n_jobs=-1, random_state=42)
+    search.fit(X_train, y_train)
     
     # Get best model
-    best_model = grid_search.best_estimator_
-    print(f"Best parameters: {grid_search.best_params_}")
+    best_model = search.best_estimator_
+    print(f"Best parameters: {search.best_params_}")
     
     # Evaluate on test set
     y_pred = best_model.predict(X_test)
     
-    # Calculate metrics
-    accuracy = accuracy_score(y_test, y_pred)
-    precision = precision_score(y_test, y_pred, average='weighted')
-    recall = recall_score(y_test, y_pred, average='weighted')
-    f1 = f1_score(y_test, y_pred, average='weighted')
+    # Calculate metrics (one report instead of a separate pass per scorer)
+    report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
+    accuracy = report['accuracy']
+    precision = report['weighted avg']['precision']
+    recall = report['weighted avg']['recall']
+    f1 = report['weighted avg']['f1-score']
     
     # Print metrics
     print(f"Model Performance:")
@@ -215,20 +297,29 @@ def train_and_evaluate():
     print(f"Recall: {recall:.4f}")
     print(f"F1 Score: {f1:.4f}")
     
-    # Plot confusion matrix
+    # Plot confusion matrix (rows and columns always SELL, HOLD, BUY)
     plt.figure(figsize=(10, 8))
-    cm = confusion_matrix(y_test, y_pred)
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-                xticklabels=['SELL', 'HOLD', 'BUY'],
-                yticklabels=['SELL', 'HOLD', 'BUY'])
+    cm = confusion_matrix(y_test, y_pred, labels=[-1, 0, 1])
+    plt.imshow(cm, cmap='Blues')
+    plt.colorbar()
+    class_names = ['SELL', 'HOLD', 'BUY']
+    plt.xticks(range(3), class_names)
+    plt.yticks(range(3), class_names)
+    for i in range(3):
+        for j in range(3):
+            # Light text on the darker half of the color scale
+            color = 'white' if cm[i, j] > cm.max() / 2 else 'black'
+            plt.text(j, i, str(cm[i, j]), ha='center', va='center', color=color)
     plt.xlabel('Predicted')
     plt.ylabel('True')
     plt.title('Confusion Matrix')
     plt.tight_layout()
     plt.savefig('prediction_model_confusion_matrix.png')
     
-    # Feature importance
-    feature_importance = best_model.feature_importances_
+    # Feature importance (histogram boosting has no impurity-based importances, so
+    # measure how much shuffling each feature lowers the test score)
+    feature_importance = permutation_importance(best_model, X_test, y_test, scoring='f1_weighted',
+                                                n_repeats=10, random_state=42, n_jobs=-1).importances_mean
     sorted_idx = np.argsort(feature_importance)
     plt.figure(figsize=(10, 12))
     plt.barh(range(len(sorted_idx)), feature_importance[sorted_idx])
@@ -237,10 +328,15 @@ def train_and_evaluate():
     plt.tight_layout()
     plt.savefig('prediction_model_feature_importance.png')
     
-    # Save model and scaler
+    # Drop the per-iteration score histories; they are training diagnostics predict() never reads
+    for attr in ('train_score_', 'validation_score_'):
+        if hasattr(best_model, attr):
+            delattr(best_model, attr)
+    
+    # Save model (no scaler, PredictionBot passes the raw features through)
     model_data = {
         'model': best_model,
-        'scaler': scaler,
+        'scaler': None,
         'feature_columns': feature_columns,
         'metrics': {
             'accuracy': accuracy,
@@ -251,8 +347,8 @@ def train_and_evaluate():
         'training_date': datetime.datetime.now().isoformat()
     }
     
-    with open('prediction_model.pkl', 'wb') as f:
-        pickle.dump(model_data, f)
+    # zlib-compressed joblib pickle; PredictionBot loads it with joblib.load
+    joblib.dump(model_data, 'prediction_model.pkl', compress=3)
     
     print("Model saved to prediction_model.pkl")
     notify('INFO', f"Prediction model trained with F1 score: {f1:.4f}")
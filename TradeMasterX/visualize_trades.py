@@ -48,6 +48,15 @@ def load_price_history():
         print(f"Error loading price history: {str(e)}")
         return None
 
+def _match_trade_prices(trades, price_df):
+    """Return the trades' timestamps with the price at the closest price-history timestamp."""
+    # One sorted nearest-key join instead of searching the price history per trade
+    return pd.merge_asof(
+        trades[['timestamp']].sort_values('timestamp'),
+        price_df[['timestamp', 'price']].sort_values('timestamp'),
+        on='timestamp', direction='nearest'
+    )
+
 def visualize_trades():
     """Visualize trades and price movements."""
     trade_df = load_trade_history()
@@ -65,26 +74,16 @@ def visualize_trades():
     # Add buy markers
     buy_trades = trade_df[trade_df['action'] == 'BUY']
     if not buy_trades.empty:
-        # For each buy trade, find the closest price point
-        for idx, trade in buy_trades.iterrows():
-            # Find closest timestamp in price data
-            closest_idx = (price_df['timestamp'] - trade['timestamp']).abs().idxmin()
-            price_at_trade = price_df.iloc[closest_idx]['price']
-            
-            # Mark the buy point
-            ax1.scatter(trade['timestamp'], price_at_trade, color='green', marker='^', s=100, label='Buy' if idx == buy_trades.index[0] else "")
+        # Mark every buy at the closest price point
+        buy_matched = _match_trade_prices(buy_trades, price_df)
+        ax1.scatter(buy_matched['timestamp'], buy_matched['price'], color='green', marker='^', s=100, label='Buy')
     
     # Add sell markers
     sell_trades = trade_df[trade_df['action'] == 'SELL']
     if not sell_trades.empty:
-        # For each sell trade, find the closest price point
-        for idx, trade in sell_trades.iterrows():
-            # Find closest timestamp in price data
-            closest_idx = (price_df['timestamp'] - trade['timestamp']).abs().idxmin()
-            price_at_trade = price_df.iloc[closest_idx]['price']
-            
-            # Mark the sell point
-            ax1.scatter(trade['timestamp'], price_at_trade, color='red', marker='v', s=100, label='Sell' if idx == sell_trades.index[0] else "")
+        # Mark every sell at the closest price point
+        sell_matched = _match_trade_prices(sell_trades, price_df)
+        ax1.scatter(sell_matched['timestamp'], sell_matched['price'], color='red', marker='v', s=100, label='Sell')
     
     ax1.set_title('Price Chart with Trade Signals')
     ax1.set_xlabel('Date')
@@ -3,14 +3,95 @@ web/app.py
 Basic Flask web interface for TradeMasterX.
 """
 import os
+import json
+import time
 import sqlite3
-import pandas as pd
-from flask import Flask, render_template, jsonify
+import threading
+from flask import Flask, Response, render_template, jsonify
+
+# Faster C JSON serializer for the API responses if available
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'trading_history.db')
 
+# One SQLite connection per request thread, opened on its first request and reused
+_local = threading.local()
+
+# Timestamp indexes the API's "ORDER BY timestamp DESC LIMIT n" queries read backwards
+# instead of sorting the whole table. Each entry lists alternatives, tried in order:
+# trades uses TradeExecutor's (timestamp, coin) index, or a plain one on an older
+# schema without a coin column
+API_INDEXES = (
+    ('CREATE INDEX IF NOT EXISTS idx_trades_ts_coin ON trades (timestamp, coin)',
+     'CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades (timestamp)'),
+    ('CREATE INDEX IF NOT EXISTS idx_portfolio_ts ON portfolio (timestamp)',),
+)
+_indexes_checked = False
+
+# Seconds an API endpoint's serialized body is reused before querying the database again
+API_CACHE_TTL = 2.0
+_api_cache = {}  # endpoint name -> (monotonic expiry time, JSON body bytes)
+
+def _get_connection():
+    """Return this thread's connection to DB_PATH, opening it on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')  # Reads don't wait for the trading bot's writes
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.row_factory = sqlite3.Row
+        _local.conn = conn
+    _ensure_indexes(conn)
+    return conn
+
+def _ensure_indexes(conn):
+    """Create the API_INDEXES, retrying on later calls until every one of them exists.
+    
+    A table that is missing (the bot has not created it yet) leaves its index
+    for a later call; once all indexes are created this returns immediately.
+    """
+    global _indexes_checked
+    if _indexes_checked:
+        return
+    
+    all_created = True
+    for alternatives in API_INDEXES:
+        for index_sql in alternatives:
+            try:
+                conn.execute(index_sql)
+                break
+            except sqlite3.OperationalError:
+                continue  # No such table or column; try the next alternative
+        else:
+            all_created = False
+    _indexes_checked = all_created
+
+def _query_json(sql):
+    """Run a query and return its rows as a JSON array of objects.
+    
+    Rows are serialized one at a time as the cursor yields them, so no list
+    of row dicts is built for the whole result.
+    """
+    dumps = orjson.dumps if orjson is not None else (lambda record: json.dumps(record).encode())
+    return b'[' + b','.join(dumps(dict(row)) for row in _get_connection().execute(sql)) + b']'
+
+def _cached_query_response(name, sql):
+    """Return a JSON response with sql's rows, reusing the body built within the last API_CACHE_TTL seconds."""
+    now = time.monotonic()
+    cached = _api_cache.get(name)
+    if cached is None or now >= cached[0]:
+        cached = (now + API_CACHE_TTL, _query_json(sql))
+        _api_cache[name] = cached
+    
+    response = Response(cached[1], mimetype='application/json')
+    response.headers['Cache-Control'] = 'max-age=5'  # Caps DB reads from rapidly polling dashboards
+    return response
+
 @app.route('/')
 def dashboard():
     return render_template('dashboard.html')
@@ -18,20 +99,14 @@ def dashboard():
 @app.route('/api/trades')
 def api_trades():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query('SELECT * FROM trades ORDER BY timestamp DESC LIMIT 100', conn)
-        conn.close()
-        return jsonify(df.to_dict(orient='records'))
+        return _cached_query_response('trades', 'SELECT * FROM trades ORDER BY timestamp DESC LIMIT 100')
     except Exception as e:
         return jsonify({'error': str(e)})
 
 @app.route('/api/portfolio')
 def api_portfolio():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query('SELECT * FROM portfolio ORDER BY timestamp DESC LIMIT 1', conn)
-        conn.close()
-        return jsonify(df.to_dict(orient='records'))
+        return _cached_query_response('portfolio', 'SELECT * FROM portfolio ORDER BY timestamp DESC LIMIT 1')
     except Exception as e:
         return jsonify({'error': str(e)})
 